@@ -0,0 +1,220 @@
+"""
+Admission control in front of the model runner.
+Caps the number of concurrent completions, queues a bounded number of waiters
+in priority order, and rejects the rest immediately with a Retry-After hint.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+# Lower values are admitted first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# Weight of the latest completion in the moving service-time average
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class QueueFull(Exception):
+    """Raised when a request cannot be admitted to the model"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Model is at capacity, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Priority-aware concurrency limiter with a bounded wait queue"""
+
+    def __init__(self, max_in_flight=2, max_queue=16, queue_timeout=None):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.service_time = None
+
+    def retry_after(self):
+        """Estimate seconds until a new request could be admitted"""
+        per_request = self.service_time or 30.0
+        waves = (len(self._waiters) + 1) / max(self.max_in_flight, 1)
+        return max(1, math.ceil(per_request * waves))
+
+    def saturated(self, queue_depth=0):
+        """True when every slot is busy and at least queue_depth requests are waiting"""
+        with self._cond:
+            return self.in_flight >= self.max_in_flight and len(self._waiters) >= queue_depth
+
+    def _admitted(self, waited):
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def _dispatch(self):
+        while self._waiters and self.in_flight < self.max_in_flight:
+            entry = heapq.heappop(self._waiters)
+            entry[2] = True
+            self.in_flight += 1
+            if entry[3] is not None:
+                entry[3]()
+        self._cond.notify_all()
+
+    def _enqueue(self, priority, wake=None):
+        """Take a free slot (returning None) or queue a waiter entry; the caller holds the lock
+
+        wake, if given, is called when the entry is admitted.
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._admitted(0.0)
+            return None
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull(self.retry_after())
+
+        # [priority, arrival order, admitted, wake]
+        entry = [priority, next(self._seq), False, wake]
+        heapq.heappush(self._waiters, entry)
+        return entry
+
+    def _withdraw(self, entry):
+        """Remove a waiter that gave up; the caller holds the lock"""
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """Block until a model slot is free; raise QueueFull if none is available"""
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.monotonic()
+        with self._cond:
+            entry = self._enqueue(priority)
+            if entry is None:
+                return
+
+            while not entry[2]:
+                remaining = None
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self._withdraw(entry)
+                        self.timed_out += 1
+                        raise QueueFull(self.retry_after())
+                self._cond.wait(remaining)
+
+            self._admitted(time.monotonic() - start)
+
+    async def acquire_async(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """acquire() for coroutines: waits on a future, without holding a thread"""
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        def resolve():
+            if not admitted.done():
+                admitted.set_result(None)
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(resolve)
+            except RuntimeError:
+                # The loop closed at shutdown; nobody is waiting any more
+                pass
+
+        with self._cond:
+            entry = self._enqueue(priority, wake)
+            if entry is None:
+                return
+
+        try:
+            await asyncio.wait_for(admitted, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._cond:
+                if not entry[2]:
+                    self._withdraw(entry)
+                    if isinstance(e, asyncio.CancelledError):
+                        raise
+                    self.timed_out += 1
+                    raise QueueFull(self.retry_after())
+                if isinstance(e, asyncio.CancelledError):
+                    # Admitted as the caller went away: hand the slot on
+                    self.in_flight -= 1
+                    self._dispatch()
+                    raise
+                # Admitted just as the timeout expired: keep the slot
+
+        with self._cond:
+            self._admitted(time.monotonic() - start)
+
+    def release(self, duration=None):
+        """Free a model slot, recording how long it was held"""
+        with self._cond:
+            self.in_flight -= 1
+            if duration is not None:
+                if self.service_time is None:
+                    self.service_time = duration
+                else:
+                    self.service_time += SERVICE_TIME_SMOOTHING * (duration - self.service_time)
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """Hold a model slot for the duration of the block"""
+        self.acquire(priority, timeout)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    @asynccontextmanager
+    async def slot_async(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """slot() for coroutines"""
+        await self.acquire_async(priority, timeout)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self):
+        """Return queue depth, utilization and wait-time statistics"""
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "queue_depth": len(self._waiters),
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_wait_seconds": round(self.total_wait / self.admitted, 3) if self.admitted else 0.0,
+                "max_wait_seconds": round(self.max_wait, 3),
+                "avg_service_seconds": round(self.service_time or 0.0, 3)
+            }
+
+
+def create_admission_controller():
+    """Create the model admission controller from environment configuration"""
+    queue_timeout = float(os.getenv('MODEL_QUEUE_TIMEOUT', '120'))
+    return AdmissionController(
+        max_in_flight=int(os.getenv('MODEL_MAX_IN_FLIGHT', '2')),
+        max_queue=int(os.getenv('MODEL_MAX_QUEUE', '16')),
+        queue_timeout=queue_timeout if queue_timeout > 0 else None
+    )
@@ -0,0 +1,155 @@
+"""
+Content-addressed artifact cache for the coding agent.
+Stores JSON artifacts (generated code, sandbox execution results) in files
+named by the SHA-256 of everything that determines them, so a repeated run
+finds them without calling the model or starting a sandbox. The directory is
+bounded in size; the least recently used artifacts are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Eviction trims the cache to this share of max_bytes so it does not run on every write
+EVICT_TO = 0.9
+
+
+def artifact_key(kind, *parts):
+    """Hex digest identifying an artifact of a kind by its inputs"""
+    canonical = json.dumps([kind, *parts], separators=(',', ':'), sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ArtifactCache:
+    """JSON artifacts on local disk, addressed by key and evicted least recently used first"""
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Relative file path -> size, least recently used first
+        self._entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(path, exist_ok=True)
+        found = []
+        for directory, _, names in os.walk(path):
+            for name in names:
+                full = os.path.join(directory, name)
+                if not name.endswith('.json'):
+                    continue
+                stat = os.stat(full)
+                found.append((stat.st_mtime, os.path.relpath(full, path), stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self.size += size
+        with self._lock:
+            self._evict()
+
+    def _name(self, kind, key):
+        return os.path.join(kind, key[:2], f"{key}.json")
+
+    def get(self, kind, key):
+        """Return the stored artifact, or None"""
+        name = self._name(kind, key)
+        full = os.path.join(self.path, name)
+        try:
+            with open(full) as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+                if name in self._entries:
+                    self.size -= self._entries.pop(name)
+            return None
+        # File times carry recency across runs
+        now = time.time()
+        try:
+            os.utime(full, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            if name in self._entries:
+                self._entries.move_to_end(name)
+        return value
+
+    def put(self, kind, key, value):
+        """Store an artifact, evicting old ones if the cache is over its size limit"""
+        name = self._name(kind, key)
+        full = os.path.join(self.path, name)
+        data = json.dumps(value).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        # Write then rename so readers never see a partial artifact
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(full), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp, full)
+        except OSError:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self.size -= self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self.size += len(data)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def delete(self, kind, key):
+        """Remove an artifact if it is stored"""
+        name = self._name(kind, key)
+        with self._lock:
+            self.size -= self._entries.pop(name, 0)
+        try:
+            os.remove(os.path.join(self.path, name))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove least recently used artifacts; the caller holds the lock"""
+        if self.size <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TO
+        while self._entries and self.size > target:
+            name, size = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+def create_artifact_cache():
+    """Create the artifact cache from environment configuration, or None when it is disabled"""
+    max_mb = float(os.getenv('ARTIFACT_CACHE_MAX_MB', '256'))
+    if max_mb <= 0:
+        return None
+    return ArtifactCache(
+        os.getenv('ARTIFACT_CACHE_DIR', '/app/output/.cache'),
+        int(max_mb * 1024 * 1024)
+    )
@@ -0,0 +1,21 @@
+"""
+ASGI entry point for the hackathon recommender.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8501 --workers 4
+
+The service module has a hyphenated file name, so it is loaded by path.
+Stores, trend refreshes and job workers start from the ASGI lifespan startup,
+once in each worker process.
+"""
+
+import importlib.util
+import os
+import sys
+
+_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hackathon-recommender.py')
+_spec = importlib.util.spec_from_file_location('hackathon_recommender', _path)
+recommender = importlib.util.module_from_spec(_spec)
+sys.modules['hackathon_recommender'] = recommender
+_spec.loader.exec_module(recommender)
+
+app = recommender.asgi_app
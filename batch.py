@@ -0,0 +1,192 @@
+"""
+Batch analysis helpers.
+Reads and deduplicates usernames, runs them through a two-stage pipeline
+(GitHub lookups, then model requests) with bounded parallelism per stage,
+and keeps a checkpoint of finished users so interrupted runs can resume.
+A general staged pipeline with bounded queues serves the coding agent.
+"""
+
+import json
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Marks the end of a stage's input
+DONE = object()
+
+
+def normalize_username(username):
+    return username.strip().lstrip('@').lower()
+
+
+def parse_username(line):
+    """Read a username from a plain line or a JSON string/object line"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line[0] in '{"':
+        try:
+            value = json.loads(line)
+        except ValueError:
+            return line
+        if isinstance(value, dict):
+            value = value.get('username') or value.get('github') or ''
+        return str(value).strip() or None
+    return line
+
+
+def read_usernames(path):
+    """Read usernames from a text or JSONL file ("-" for stdin)"""
+    if path == '-':
+        lines = sys.stdin.readlines()
+    else:
+        with open(path) as f:
+            lines = f.readlines()
+    return [u for u in map(parse_username, lines) if u]
+
+
+def dedupe_usernames(usernames):
+    """Drop case-insensitive duplicates, keeping first-seen order"""
+    seen = set()
+    unique = []
+    for username in usernames:
+        key = normalize_username(username)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(username.strip().lstrip('@'))
+    return unique
+
+
+class Checkpoint:
+    """Append-only record of usernames whose results were written"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = {normalize_username(line) for line in f if line.strip()}
+        self._file = open(path, 'a')
+        self._lock = threading.Lock()
+
+    def __contains__(self, username):
+        return normalize_username(username) in self.done
+
+    def record(self, username):
+        with self._lock:
+            self.done.add(normalize_username(username))
+            self._file.write(normalize_username(username) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def run_pipeline(usernames, lookup, recommend, lookup_workers=8, model_workers=2):
+    """Yield one result record per username, in completion order
+
+    lookup(username) returns a profile; recommend(profile) returns the
+    analysis payload. Lookups run ahead on their own pool so the model
+    stage always has work queued for its model_workers slots.
+    """
+    results = queue.Queue()
+
+    def failed(username, error):
+        results.put({"username": username, "success": False, "error": str(error)})
+
+    def on_recommendation(username, future):
+        try:
+            results.put({"username": username, **future.result()})
+        except Exception as e:
+            failed(username, e)
+
+    def on_lookup(username, future):
+        try:
+            profile = future.result()
+        except Exception as e:
+            failed(username, e)
+            return
+        try:
+            model_pool.submit(recommend, profile).add_done_callback(
+                lambda f: on_recommendation(username, f)
+            )
+        except RuntimeError as e:
+            # The pipeline was closed while this lookup was finishing
+            failed(username, e)
+
+    lookup_pool = ThreadPoolExecutor(max_workers=lookup_workers, thread_name_prefix='batch-lookup')
+    model_pool = ThreadPoolExecutor(max_workers=model_workers, thread_name_prefix='batch-model')
+    try:
+        for username in usernames:
+            lookup_pool.submit(lookup, username).add_done_callback(
+                lambda f, username=username: on_lookup(username, f)
+            )
+        for _ in usernames:
+            yield results.get()
+    finally:
+        lookup_pool.shutdown(wait=False, cancel_futures=True)
+        model_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_stages(items, stages, queue_size=4):
+    """Yield (result, error) for each item once it has passed every stage, in completion order
+
+    stages is a list of (function, workers). Every stage has its own worker
+    threads reading a bounded queue, so each stage works on the next item
+    while later stages handle earlier ones, and a slow stage holds back the
+    stages before it instead of letting work pile up. A function returns the
+    value handed to the next stage; if it raises, (item, exception) is
+    yielded for the item it was given and the remaining stages are skipped.
+    """
+    inboxes = [queue.Queue(maxsize=queue_size) for _ in stages]
+    results = queue.Queue()
+    remaining = [workers for _, workers in stages]
+    lock = threading.Lock()
+
+    def forward(index, value):
+        if index + 1 < len(stages):
+            inboxes[index + 1].put(value)
+        else:
+            results.put(value if value is DONE else (value, None))
+
+    def work(index, function):
+        inbox = inboxes[index]
+        while True:
+            item = inbox.get()
+            if item is DONE:
+                with lock:
+                    remaining[index] -= 1
+                    last = remaining[index] == 0
+                # The last worker of a stage to finish closes the next one
+                if last:
+                    forward(index, DONE)
+                else:
+                    inbox.put(DONE)
+                return
+            try:
+                value = function(item)
+            except Exception as e:
+                results.put((item, e))
+                continue
+            forward(index, value)
+
+    def feed():
+        try:
+            for item in items:
+                inboxes[0].put(item)
+        finally:
+            inboxes[0].put(DONE)
+
+    for index, (function, workers) in enumerate(stages):
+        for n in range(workers):
+            threading.Thread(target=work, args=(index, function), name=f"stage-{index}-{n}", daemon=True).start()
+    threading.Thread(target=feed, name='stage-feed', daemon=True).start()
+
+    while True:
+        result = results.get()
+        if result is DONE:
+            return
+        yield result
@@ -0,0 +1,48 @@
+"""
+Latency distributions for the stub servers, parsed from short specs:
+
+    0.05                  fixed 50 ms
+    fixed:0.05            the same
+    uniform:0.02:0.2      uniform between 20 and 200 ms
+    normal:0.1:0.02       mean 100 ms, standard deviation 20 ms (never negative)
+    lognormal:0.1:0.5     median 100 ms, sigma 0.5: a long right tail like real APIs
+    exp:0.1               exponential with a 100 ms mean
+"""
+
+import math
+import random
+
+
+def parse_distribution(spec, rng=None):
+    """Return a function sampling seconds from a distribution spec"""
+    rng = rng or random.Random()
+    kind, _, params = str(spec).partition(':')
+    try:
+        if not params:
+            value = float(kind)
+            return lambda: value
+        args = [float(p) for p in params.split(':')]
+    except ValueError:
+        raise ValueError(f"Invalid latency distribution: {spec}")
+
+    if kind == 'fixed' and len(args) == 1:
+        return lambda: args[0]
+    if kind == 'uniform' and len(args) == 2:
+        return lambda: rng.uniform(*args)
+    if kind == 'normal' and len(args) == 2:
+        return lambda: max(0.0, rng.gauss(*args))
+    if kind == 'lognormal' and len(args) == 2:
+        return lambda: rng.lognormvariate(math.log(args[0]), args[1])
+    if kind == 'exp' and len(args) == 1:
+        return lambda: rng.expovariate(1 / args[0])
+    raise ValueError(f"Invalid latency distribution: {spec}")
+
+
+def parse_tool_distributions(spec, rng=None):
+    """Parse "tool=dist,tool=dist" into a dict of samplers"""
+    samplers = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            name, dist = item.split('=', 1)
+            samplers[name.strip()] = parse_distribution(dist.strip(), rng)
+    return samplers
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator for the recommender's analysis endpoints.
+Requests are started on a schedule at the target rate (Poisson or evenly
+spaced arrivals) whether or not earlier ones have finished, so a slow service
+shows up as growing latency and errors instead of a quietly lower request
+rate. Usernames are drawn from a fixed pool, so repeat users exercise the
+caches as real traffic would.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from report import format_markdown, format_report, load_report, parse_server_metrics, regressions
+
+
+def post(url, payload, timeout):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={"Content-Type": "application/json"})
+    return urllib.request.urlopen(request, timeout=timeout)
+
+
+def analyze_once(target, username, timeout):
+    """POST /analyze; return (outcome, ttft_ms)"""
+    with post(f"{target}/analyze", {"username": username}, timeout) as response:
+        payload = json.loads(response.read())
+    if not payload.get("success"):
+        return 'error', None
+    if payload.get("retrieved"):
+        return 'retrieved', None
+    return ('cached' if payload.get("cached") else 'ok'), None
+
+
+def stream_once(target, username, timeout):
+    """POST /analyze/stream; return (outcome, ttft_ms) from its Server-Sent Events"""
+    started = time.perf_counter()
+    ttft = None
+    event = None
+    with post(f"{target}/analyze/stream", {"username": username}, timeout) as response:
+        for raw in response:
+            line = raw.decode('utf-8').rstrip('\n')
+            if line.startswith('event: '):
+                event = line[7:]
+            elif line.startswith('data: '):
+                if event == 'token' and ttft is None:
+                    ttft = (time.perf_counter() - started) * 1000
+                elif event == 'error':
+                    return ('rejected' if 'retry_after' in json.loads(line[6:]) else 'error'), ttft
+                elif event == 'done':
+                    data = json.loads(line[6:])
+                    if data.get("retrieved"):
+                        return 'retrieved', ttft
+                    return ('cached' if data.get("cached") else 'ok'), ttft
+    return 'error', ttft
+
+
+ENDPOINTS = {"analyze": analyze_once, "stream": stream_once}
+
+
+def send(target, endpoint, username, timeout):
+    """One request: a record with its outcome and latency"""
+    started = time.perf_counter()
+    try:
+        outcome, ttft = ENDPOINTS[endpoint](target, username, timeout)
+    except urllib.error.HTTPError as e:
+        outcome, ttft = ('rejected' if e.code == 429 else f"http_{e.code}"), None
+    except Exception as e:
+        outcome, ttft = ('timeout' if 'timed out' in str(e) else 'connection_error'), None
+    return {
+        "username": username,
+        "outcome": outcome,
+        "latency_ms": (time.perf_counter() - started) * 1000,
+        "ttft_ms": ttft
+    }
+
+
+def arrival_times(rps, duration, poisson, rng):
+    """Offsets in seconds at which requests start"""
+    t = 0.0
+    while True:
+        t += rng.expovariate(rps) if poisson else 1 / rps
+        if t >= duration:
+            return
+        yield t
+
+
+def run_load(target, rps, duration, endpoint='analyze', users=200, poisson=True, max_in_flight=256,
+             timeout=120, seed=1):
+    """Drive target at rps for duration seconds; return (records, elapsed, send_window)"""
+    rng = random.Random(seed)
+    pool = [f"bench-user-{i:05d}" for i in range(users)]
+    records = []
+    lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    def run(username):
+        try:
+            record = send(target, endpoint, username, timeout)
+        finally:
+            in_flight.release()
+        with lock:
+            records.append(record)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='load') as executor:
+        for offset in arrival_times(rps, duration, poisson, rng):
+            time.sleep(max(0.0, started + offset - time.perf_counter()))
+            username = rng.choice(pool)
+            if not in_flight.acquire(blocking=False):
+                # The client is the bottleneck; count it rather than slow the schedule
+                with lock:
+                    records.append({"username": username, "outcome": 'dropped', "latency_ms": 0.0, "ttft_ms": None})
+                continue
+            executor.submit(run, username)
+        send_window = time.perf_counter() - started
+    return records, time.perf_counter() - started, send_window
+
+
+def server_metrics(target):
+    """Server-side stage timings from /metrics, or None if unavailable"""
+    try:
+        with urllib.request.urlopen(f"{target}/metrics", timeout=10) as response:
+            return parse_server_metrics(response.read().decode('utf-8'))
+    except Exception:
+        return None
+
+
+def add_load_arguments(parser):
+    """Load options shared with run_load_test.py"""
+    parser.add_argument('--rps', type=float, default=2.0, help='Target requests per second')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to send requests for')
+    parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='analyze',
+                        help='analyze (JSON) or stream (Server-Sent Events, also measures time to first token)')
+    parser.add_argument('--users', type=int, default=200, help='Distinct usernames requests are drawn from')
+    parser.add_argument('--arrivals', choices=['poisson', 'constant'], default='poisson')
+    parser.add_argument('--max-in-flight', type=int, default=256, help='Client-side cap on open requests')
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    parser.add_argument('--markdown', help='Append the report as a Markdown table to this file')
+    parser.add_argument('--baseline', help='Report JSON from an earlier run to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Allowed latency or throughput regression against --baseline')
+    parser.add_argument('--max-error-rate', type=float, default=1.0, help='Fail if the error rate is higher')
+
+
+def run_and_report(target, args, config=None):
+    """Run the load, print and save the report; return the process exit code"""
+    print(f"🚦 Sending {args.rps} req/s to {target} for {args.duration:.0f}s ({args.endpoint}, {args.arrivals})")
+    records, elapsed, send_window = run_load(target, args.rps, args.duration, args.endpoint, args.users,
+                                args.arrivals == 'poisson', args.max_in_flight, args.timeout, args.seed)
+    config = dict(config or {}, rps=args.rps, duration=args.duration, endpoint=args.endpoint,
+                  users=args.users, arrivals=args.arrivals)
+    report = load_report(records, elapsed, send_window, config)
+    report["server"] = server_metrics(target)
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.markdown:
+        with open(args.markdown, 'a') as f:
+            f.write(f"### Load test: {args.endpoint} at {args.rps} req/s\n\n{format_markdown(report)}\n")
+
+    failed = False
+    if report["error_rate"] > args.max_error_rate:
+        print(f"❌ Error rate {report['error_rate']:.2%} is above {args.max_error_rate:.2%}")
+        failed = True
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(report, json.load(f), args.max_regression)
+        for regression in found:
+            print(f"❌ Regression: {regression}")
+        failed = failed or bool(found)
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', default='http://localhost:8501', help='Recommender base URL')
+    add_load_arguments(parser)
+    args = parser.parse_args()
+    sys.exit(run_and_report(args.target.rstrip('/'), args))
+
+
+if __name__ == '__main__':
+    main()
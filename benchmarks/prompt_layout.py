@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark the recommendation prompt layouts against a model runner.
+Sends the same sequence of synthetic developer profiles with each layout and
+reports latency, prefill time and how much of each prompt the runner served
+from its KV cache. Without --base-url a local stub runner is started, which is
+what CI uses; point --base-url at Docker Model Runner or llama.cpp's server to
+measure a real model.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from recommendations import LAYOUTS, recommendation_messages  # noqa: E402
+from report import percentile  # noqa: E402
+from stub_model_server import ModelSimulator, start_server  # noqa: E402
+
+LANGUAGES = ['Python', 'TypeScript', 'Go', 'Rust', 'Java', 'C++', 'Kotlin', 'Swift', 'Ruby', 'JavaScript']
+TOPICS = ['machine-learning', 'web', 'cli', 'devops', 'blockchain', 'games', 'data', 'security', 'iot', 'api']
+FRAMEWORKS = ['React', 'FastAPI', 'Django', 'Flask', 'Docker', 'Kubernetes', 'PyTorch', 'Next.js', 'Express']
+
+TRENDS = """Current trending technologies on GitHub:
+**Trending Languages**: Python, TypeScript, Rust, Go, Zig
+**Hot Topics**: ai-agents, llm, rag, mcp, local-first, wasm, observability
+**Example Trending Repositories**: agent frameworks, local model runners, vector databases"""
+
+
+def synthetic_profiles(count, seed):
+    """Developer profiles with a stable, seeded mix of skills"""
+    rng = random.Random(seed)
+    with open(os.path.join(ROOT, 'ideas.jsonl')) as f:
+        ideas = [json.loads(line) for line in f if line.strip()]
+    return [
+        (
+            {"login": f"dev{i:04d}", "public_repos": rng.randint(3, 200), "bio": rng.choice(['', 'Builder of things'])},
+            ', '.join(rng.sample(LANGUAGES, 3)),
+            ', '.join(rng.sample(TOPICS, 4)),
+            ', '.join(rng.sample(FRAMEWORKS, 3)),
+            rng.sample(ideas, 4)
+        )
+        for i in range(count)
+    ]
+
+
+def chat_completion(base_url, model, messages, max_tokens, timeout):
+    request = urllib.request.Request(
+        f"{base_url.rstrip('/')}/chat/completions",
+        data=json.dumps({"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": 0}).encode(),
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY', 'stub')}"}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def cached_tokens(result):
+    """Prompt tokens served from the KV cache, from llama.cpp timings or OpenAI usage"""
+    timings = result.get("timings") or {}
+    if "cache_n" in timings:
+        return timings["cache_n"]
+    return ((result.get("usage") or {}).get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+
+
+def run_layout(layout, profiles, args):
+    latencies = []
+    prefill = []
+    prompt_tokens = 0
+    cached = 0
+    # One untimed request so both layouts start with the instructions cached
+    # if they can be, as they would in a running service
+    warmup = profiles[-1]
+    chat_completion(args.base_url, args.model, recommendation_messages(*warmup[:4], TRENDS, warmup[4], layout)[0],
+                    args.max_tokens, args.timeout)
+    started = time.perf_counter()
+    for user_info, languages, topics, frameworks, candidates in profiles:
+        messages, _ = recommendation_messages(user_info, languages, topics, frameworks, TRENDS, candidates, layout)
+        sent = time.perf_counter()
+        result = chat_completion(args.base_url, args.model, messages, args.max_tokens, args.timeout)
+        latencies.append((time.perf_counter() - sent) * 1000)
+        timings = result.get("timings") or {}
+        if "prompt_ms" in timings:
+            prefill.append(timings["prompt_ms"])
+        prompt_tokens += (result.get("usage") or {}).get("prompt_tokens", 0)
+        cached += cached_tokens(result)
+    elapsed = time.perf_counter() - started
+    return {
+        "layout": layout,
+        "requests": len(profiles),
+        "mean_ms": round(sum(latencies) / len(latencies), 1),
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "prefill_ms": round(sum(prefill) / len(prefill), 1) if prefill else None,
+        "cached_ratio": round(cached / prompt_tokens, 3) if prompt_tokens else None,
+        "requests_per_s": round(len(profiles) / elapsed, 2)
+    }
+
+
+def shared_prefix(profiles):
+    """True if every prefix-layout request starts with the same system message, byte for byte"""
+    systems = {
+        recommendation_messages(user_info, languages, topics, frameworks, TRENDS, candidates, 'prefix')[0][0]["content"]
+        for user_info, languages, topics, frameworks, candidates in profiles
+    }
+    return len(systems) == 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', help='OpenAI-compatible base URL (default: start a local stub runner)')
+    parser.add_argument('--model', default=os.getenv('MODEL_NAME', 'stub'))
+    parser.add_argument('--requests', type=int, default=20, help='Profiles sent per layout')
+    parser.add_argument('--max-tokens', type=int, default=16, help='Tokens generated per request')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--min-speedup', type=float, default=0,
+                        help='Fail unless the prefix layout is this many times faster on mean latency '
+                             '(timing-sensitive; prefer --check-prefix on shared runners)')
+    parser.add_argument('--check-prefix', action='store_true',
+                        help='Fail unless the prefix layout sends a byte-identical system message on every '
+                             'request and gets a larger share of its prompt from the KV cache than inline')
+    parser.add_argument('--output', help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    server = None
+    if not args.base_url:
+        server, args.base_url = start_server(ModelSimulator())
+        print(f"🧪 Using stub model runner at {args.base_url}")
+
+    profiles = synthetic_profiles(args.requests, args.seed)
+    results = []
+    try:
+        for layout in LAYOUTS:
+            print(f"⏱️ Benchmarking {layout} layout with {args.requests} requests...")
+            results.append(run_layout(layout, profiles, args))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print(f"\n{'layout':<8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'prefill ms':>11} {'cached':>7} {'req/s':>7}")
+    for r in results:
+        prefill = '-' if r["prefill_ms"] is None else f"{r['prefill_ms']:.1f}"
+        cached = '-' if r["cached_ratio"] is None else f"{r['cached_ratio']:.0%}"
+        print(f"{r['layout']:<8} {r['mean_ms']:>9.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{prefill:>11} {cached:>7} {r['requests_per_s']:>7.2f}")
+
+    by_layout = {r["layout"]: r for r in results}
+    speedup = by_layout["inline"]["mean_ms"] / by_layout["prefix"]["mean_ms"]
+    print(f"\n🚀 Prefix layout speedup: {speedup:.2f}x")
+
+    identical = shared_prefix(profiles)
+    print(f"🔁 Byte-identical system prefix: {'yes' if identical else 'no'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"results": results, "speedup": round(speedup, 3), "identical_prefix": identical}, f, indent=2)
+
+    if args.check_prefix:
+        if not identical:
+            print("❌ The prefix layout's system message differs between requests")
+            sys.exit(1)
+        if (by_layout["prefix"]["cached_ratio"] or 0) <= (by_layout["inline"]["cached_ratio"] or 0):
+            print("❌ The prefix layout is not served from the KV cache more than inline")
+            sys.exit(1)
+
+    if args.min_speedup and speedup < args.min_speedup:
+        print(f"❌ Speedup below {args.min_speedup}x")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Latency summaries and load-test reports.
+Reports are plain dicts so they can be written as JSON, compared against a
+baseline from an earlier run and rendered as a table or Markdown.
+"""
+
+import math
+import re
+from collections import Counter
+
+# Outcomes that count as successful responses
+OK_OUTCOMES = ('ok', 'cached', 'retrieved')
+
+# Server-side timings read back from /metrics after a run
+SERVER_SERIES = re.compile(
+    r'^hackathon_(stage|mcp_tool|llm_request|llm_time_to_first_token)_seconds_(sum|count)(\{[^}]*\})? (\S+)$'
+)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of values (0 < fraction <= 1)"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+
+def latency_summary(latencies_ms):
+    """Mean and percentile latencies in milliseconds"""
+    if not latencies_ms:
+        return {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "mean": round(sum(latencies_ms) / len(latencies_ms), 1),
+        "p50": round(percentile(latencies_ms, 0.50), 1),
+        "p95": round(percentile(latencies_ms, 0.95), 1),
+        "p99": round(percentile(latencies_ms, 0.99), 1),
+        "max": round(max(latencies_ms), 1)
+    }
+
+
+def load_report(records, elapsed, send_window, config):
+    """Summarize load-generator records (dicts with outcome, latency_ms and optional ttft_ms)
+
+    send_window is how long requests were being started for; elapsed also
+    includes waiting for the last responses.
+    """
+    outcomes = Counter(record["outcome"] for record in records)
+    ok = [record for record in records if record["outcome"] in OK_OUTCOMES]
+    ttfts = [record["ttft_ms"] for record in ok if record.get("ttft_ms") is not None]
+    sent = len(records)
+    return {
+        "config": config,
+        "requests": sent,
+        "elapsed_s": round(elapsed, 2),
+        "offered_rps": round(sent / send_window, 2) if send_window else 0.0,
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - len(ok) / sent, 4) if sent else 0.0,
+        "outcomes": dict(sorted(outcomes.items())),
+        "latency_ms": latency_summary([record["latency_ms"] for record in ok]),
+        "ttft_ms": latency_summary(ttfts) if ttfts else None
+    }
+
+
+def parse_server_metrics(text):
+    """Mean server-side seconds per stage, MCP tool and model call from /metrics text"""
+    totals = {}
+    for line in text.splitlines():
+        match = SERVER_SERIES.match(line)
+        if not match:
+            continue
+        family, field, labels, value = match.groups()
+        name = family
+        for label, label_value in re.findall(r'(\w+)="([^"]*)"', labels or ''):
+            if label in ('stage', 'tool', 'mode'):
+                name = f"{family}.{label_value}"
+        if 'outcome="error"' in (labels or ''):
+            continue
+        entry = totals.setdefault(name, {"sum": 0.0, "count": 0.0})
+        entry[field] += float(value)
+    return {
+        name: {"count": int(entry["count"]), "mean_ms": round(entry["sum"] / entry["count"] * 1000, 1)}
+        for name, entry in sorted(totals.items()) if entry["count"]
+    }
+
+
+def regressions(report, baseline, max_regression):
+    """Latency and throughput figures worse than baseline by more than max_regression"""
+    found = []
+    for key in ('p50', 'p95', 'p99'):
+        now, before = report["latency_ms"][key], baseline["latency_ms"][key]
+        if now is not None and before and now > before * (1 + max_regression):
+            found.append(f"{key} latency {before} ms -> {now} ms")
+    now, before = report["throughput_rps"], baseline["throughput_rps"]
+    if before and now < before * (1 - max_regression):
+        found.append(f"throughput {before} -> {now} req/s")
+    return found
+
+
+def format_ms(value):
+    return '-' if value is None else f"{value:.1f}"
+
+
+def report_rows(report):
+    latency = report["latency_ms"]
+    rows = [
+        ("requests", str(report["requests"])),
+        ("offered load", f"{report['offered_rps']:.2f} req/s"),
+        ("throughput", f"{report['throughput_rps']:.2f} req/s"),
+        ("error rate", f"{report['error_rate']:.2%}"),
+        ("outcomes", ', '.join(f"{k}={v}" for k, v in report["outcomes"].items())),
+        ("latency p50 / p95 / p99", f"{format_ms(latency['p50'])} / {format_ms(latency['p95'])} / "
+                                    f"{format_ms(latency['p99'])} ms"),
+        ("latency mean / max", f"{format_ms(latency['mean'])} / {format_ms(latency['max'])} ms")
+    ]
+    if report.get("ttft_ms"):
+        ttft = report["ttft_ms"]
+        rows.append(("first token p50 / p95 / p99",
+                     f"{format_ms(ttft['p50'])} / {format_ms(ttft['p95'])} / {format_ms(ttft['p99'])} ms"))
+    for name, entry in (report.get("server") or {}).items():
+        rows.append((f"server {name}", f"{entry['mean_ms']:.1f} ms mean over {entry['count']}"))
+    return rows
+
+
+def format_report(report):
+    """Plain-text table of a report"""
+    rows = report_rows(report)
+    width = max(len(label) for label, _ in rows)
+    return '\n'.join(f"{label:<{width}}  {value}" for label, value in rows)
+
+
+def format_markdown(report):
+    """Markdown table of a report, e.g. for a CI job summary"""
+    lines = ["| Metric | Value |", "|--------|-------|"]
+    lines.extend(f"| {label} | {value} |" for label, value in report_rows(report))
+    return '\n'.join(lines) + '\n'
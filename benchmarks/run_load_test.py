@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of hackathon-recommender.py without GitHub, DuckDuckGo or a GPU.
+Starts the stub MCP Gateway and stub model runner, launches the service
+against them in a subprocess (on port 8501, where it always listens), drives
+it with the load generator and reports latency percentiles, throughput and
+error rates. Extra service settings can be passed with --env to compare
+configurations.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import stub_mcp_server
+import stub_model_server
+from loadgen import add_load_arguments, run_and_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_URL = 'http://127.0.0.1:8501'
+
+
+def wait_until_healthy(process, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Service exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{SERVICE_URL}/health", timeout=2):
+                return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError(f"Service not healthy after {timeout}s")
+
+
+def service_environment(args, mcp_url, model_url, workdir):
+    env = dict(os.environ)
+    env.update({
+        "MCPGATEWAY_ENDPOINT": mcp_url,
+        "MODEL_PROVIDER": "docker-model-runner",
+        "OPENAI_BASE_URL": model_url,
+        "MODEL_NAME": "stub",
+        "SERVER_MODE": args.mode,
+        # Keep state from earlier runs out of the measurement
+        "PROFILE_STORE_PATH": os.path.join(workdir, 'profiles.db'),
+        "IDEAS_LEARNED_PATH": os.path.join(workdir, 'learned-ideas.jsonl'),
+        "JOB_DB_PATH": os.path.join(workdir, 'jobs.db'),
+        "PYTHONUNBUFFERED": "1"
+    })
+    for setting in args.env:
+        name, _, value = setting.partition('=')
+        env[name] = value
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mode', choices=['flask', 'asgi'], default='flask', help='Service SERVER_MODE')
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='Extra service environment, e.g. --env MODEL_MAX_IN_FLIGHT=4 (repeatable)')
+    parser.add_argument('--service-log', help='File for the service output (default: a temporary file)')
+    parser.add_argument('--startup-timeout', type=float, default=60.0)
+    stub_mcp_server.add_gateway_arguments(parser)
+    stub_model_server.add_model_arguments(parser)
+    parser.set_defaults(decode_tps=200.0, completion_tokens=300, slots=2)
+    add_load_arguments(parser)
+    args = parser.parse_args()
+
+    mcp, mcp_url = stub_mcp_server.start_server(stub_mcp_server.simulator_from_arguments(args))
+    model, model_url = stub_model_server.start_server(stub_model_server.simulator_from_arguments(args))
+    print(f"🧪 Stub MCP Gateway at {mcp_url}, stub model runner at {model_url}")
+
+    with tempfile.TemporaryDirectory(prefix='loadtest-') as workdir:
+        log_path = args.service_log or os.path.join(workdir, 'service.log')
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(
+                [sys.executable, os.path.join(ROOT, 'hackathon-recommender.py')],
+                cwd=workdir, env=service_environment(args, mcp_url, model_url, workdir),
+                stdout=log, stderr=subprocess.STDOUT
+            )
+            try:
+                wait_until_healthy(process, args.startup_timeout)
+                config = {
+                    "mode": args.mode,
+                    "env": args.env,
+                    "mcp_latency": args.mcp_latency,
+                    "tool_latency": args.tool_latency,
+                    "mcp_error_rate": args.mcp_error_rate,
+                    "decode_tps": args.decode_tps,
+                    "prefill_tps": args.prefill_tps,
+                    "slots": args.slots,
+                    "completion_tokens": args.completion_tokens
+                }
+                code = run_and_report(SERVICE_URL, args, config)
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                log.flush()
+                with open(log_path) as f:
+                    print(f.read()[-4000:])
+                code = 1
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                mcp.shutdown()
+                model.shutdown()
+    sys.exit(code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Stub MCP Gateway for benchmarks.
+Serves the /mcp JSON-RPC tools/call endpoint for the tools the recommender
+uses (search_users, search_repositories and the DuckDuckGo search) with
+synthetic but stable data: every username maps to the same profile and
+repositories on every run. Each tool call waits for a latency sampled from a
+configurable distribution, and a share of calls can be made to fail.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from distributions import parse_distribution, parse_tool_distributions
+
+LANGUAGES = ['Python', 'TypeScript', 'JavaScript', 'Go', 'Rust', 'Java', 'C++', 'Kotlin', 'Swift', 'Ruby']
+TECHNOLOGIES = ['React', 'Django', 'FastAPI', 'Flask', 'Docker', 'Kubernetes', 'PyTorch', 'TensorFlow',
+                'Next.js', 'Express', 'PostgreSQL', 'Redis', 'GraphQL', 'Terraform', 'Vue']
+TOPICS = ['machine-learning', 'web', 'cli', 'devops', 'blockchain', 'games', 'data-science', 'security',
+          'iot', 'api', 'llm', 'automation', 'education', 'climate']
+WORDS = ['atlas', 'beacon', 'comet', 'delta', 'ember', 'flux', 'grove', 'harbor', 'iris', 'juniper',
+         'kite', 'lumen', 'meadow', 'nova', 'orbit', 'pixel', 'quartz', 'relay', 'summit', 'tide']
+
+# Repositories are "updated" over the years before this date
+LATEST_UPDATE = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+QUERY_USER = re.compile(r'user:(\S+)')
+
+
+def seeded(*parts):
+    """Random generator seeded from parts, stable across processes"""
+    digest = hashlib.sha256('\0'.join(map(str, parts)).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def repo_count(username):
+    """Most users have a few dozen repositories, some have hundreds"""
+    return max(1, min(400, int(seeded(username, 'repos').lognormvariate(3.2, 0.9))))
+
+
+def synthetic_user(username):
+    rng = seeded(username, 'user')
+    return {
+        "login": username,
+        "id": rng.randrange(1, 10 ** 8),
+        "type": "User",
+        "public_repos": repo_count(username),
+        "bio": rng.choice(['', 'Open source enthusiast', 'Building developer tools', 'ML engineer']) or None
+    }
+
+
+def synthetic_repos(username):
+    """All of a user's repositories, most recently updated first"""
+    rng = seeded(username, 'repositories')
+    languages = rng.sample(LANGUAGES, 3)
+    repos = []
+    updated = LATEST_UPDATE
+    for i in range(repo_count(username)):
+        updated -= timedelta(hours=rng.randint(1, 24 * 30))
+        technologies = rng.sample(TECHNOLOGIES, 2)
+        name = f"{rng.choice(WORDS)}-{rng.choice(WORDS)}-{i}"
+        repos.append({
+            "id": int.from_bytes(hashlib.sha256(f"{username}/{i}".encode()).digest()[:6], 'big'),
+            "name": name,
+            "full_name": f"{username}/{name}",
+            "description": f"A {technologies[0]} project using {technologies[1]}",
+            "language": rng.choices(languages, weights=(6, 3, 1))[0],
+            "topics": rng.sample(TOPICS, rng.randint(0, 3)),
+            "stargazers_count": int(rng.paretovariate(1.2)) - 1,
+            "size": rng.randint(10, 50000),
+            "fork": False,
+            "updated_at": updated.strftime('%Y-%m-%dT%H:%M:%SZ')
+        })
+    return repos
+
+
+def search_users(arguments):
+    match = QUERY_USER.search(arguments.get("query", ""))
+    if not match:
+        return {"total_count": 0, "incomplete_results": False, "items": []}
+    return {"total_count": 1, "incomplete_results": False, "items": [synthetic_user(match.group(1))]}
+
+
+def search_repositories(arguments):
+    match = QUERY_USER.search(arguments.get("query", ""))
+    repos = synthetic_repos(match.group(1)) if match else []
+    per_page = min(int(arguments.get("per_page") or 30), 100)
+    page = max(int(arguments.get("page") or 1), 1)
+    start = (page - 1) * per_page
+    return {"total_count": len(repos), "incomplete_results": False, "items": repos[start:start + per_page]}
+
+
+def search(arguments):
+    rng = seeded(arguments.get("query", ""), 'search')
+    return {"results": [
+        {
+            "title": f"{rng.choice(WORDS).title()} {rng.choice(TOPICS)} hackathon winner",
+            "url": f"https://example.com/{i}",
+            "snippet": "Trending hackathon project"
+        }
+        for i in range(int(arguments.get("max_results") or 3))
+    ]}
+
+
+TOOLS = {
+    "search_users": search_users,
+    "search_repositories": search_repositories,
+    "search": search
+}
+
+
+class GatewaySimulator:
+    """Tool handlers with sampled latency and injected failures"""
+
+    def __init__(self, latency=None, tool_latency=None, error_rate=0.0, seed=None):
+        self.latency = latency or (lambda: 0.0)
+        self.tool_latency = dict(tool_latency or {})
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def call(self, name, arguments):
+        """Return (result, error) for a tool call"""
+        with self._lock:
+            self.calls += 1
+            failed = self._rng.random() < self.error_rate
+        time.sleep(self.tool_latency.get(name, self.latency)())
+        if name not in TOOLS:
+            return None, {"code": -32602, "message": f"Unknown tool: {name}"}
+        if failed:
+            return None, {"code": -32000, "message": f"Injected failure in {name}"}
+        return TOOLS[name](arguments or {}), None
+
+
+def make_handler(simulator):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, payload, status=200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/mcp':
+                self.send_json({"error": "not found"}, 404)
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                message = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self.send_json({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}})
+                return
+            if message.get("method") != "tools/call":
+                self.send_json({"jsonrpc": "2.0", "id": message.get("id"),
+                                "error": {"code": -32601, "message": "Method not found"}})
+                return
+            params = message.get("params") or {}
+            result, error = simulator.call(params.get("name"), params.get("arguments"))
+            reply = {"jsonrpc": "2.0", "id": message.get("id")}
+            reply.update({"error": error} if error else {"result": result})
+            self.send_json(reply)
+
+    return Handler
+
+
+def start_server(simulator, host='127.0.0.1', port=0):
+    """Serve in a background thread; return (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(simulator))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='stub-mcp', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_gateway_arguments(parser):
+    """Simulation options shared with the benchmark runners"""
+    parser.add_argument('--mcp-latency', default='lognormal:0.15:0.5',
+                        help='Latency of every tool call, e.g. 0.1 or lognormal:0.15:0.5')
+    parser.add_argument('--tool-latency', default='', help='Per-tool latency, e.g. search=lognormal:0.8:0.4')
+    parser.add_argument('--mcp-error-rate', type=float, default=0.0, help='Share of tool calls that fail')
+
+
+def simulator_from_arguments(args):
+    return GatewaySimulator(parse_distribution(args.mcp_latency), parse_tool_distributions(args.tool_latency),
+                            args.mcp_error_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8811)
+    add_gateway_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_server(simulator_from_arguments(args), args.host, args.port)
+    print(f"🧪 Stub MCP Gateway at {base_url}/mcp")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible stub of a llama.cpp-style model runner for benchmarks.
+Prompt processing (prefill) is simulated at a fixed rate for the part of each
+prompt that is not already in a slot's KV cache, and decoding at another, so
+prompt layout changes show up as latency without a GPU. Each slot serves one
+request at a time, like llama.cpp's --parallel. Streamed responses send one
+token per chunk as it is "decoded".
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from distributions import parse_distribution
+
+CHARS_PER_TOKEN = 4
+
+
+def render_chat(messages):
+    """Flatten chat messages the way ChatML chat templates do"""
+    turns = ''.join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages)
+    return turns + "<|im_start|>assistant\n"
+
+
+def common_prefix(a, b):
+    return len(os.path.commonprefix([a, b]))
+
+
+class ModelSimulator:
+    """One model with a few KV-cache slots, each serving a request at a time
+
+    overhead samples extra seconds per request (scheduling, network) and
+    completion_tokens caps how long replies run before the model stops on its
+    own (None generates max_tokens).
+    """
+
+    def __init__(self, prefill_tps=1000.0, decode_tps=50.0, slots=1, overhead=None, completion_tokens=None):
+        self.prefill_tps = prefill_tps
+        self.decode_tps = decode_tps
+        self.overhead = overhead or (lambda: 0.0)
+        self.completion_tokens = completion_tokens
+        self._slots = [''] * slots
+        self._busy = [False] * slots
+        self._last_used = [0] * slots
+        self._clock = itertools.count(1)
+        self._free = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+
+    def _claim_slot(self, prompt):
+        """Free slot sharing the longest prefix with prompt, else the least recently used"""
+        with self._lock:
+            free = [i for i, busy in enumerate(self._busy) if not busy]
+            slot = max(free, key=lambda i: (common_prefix(self._slots[i], prompt), -self._last_used[i]))
+            if common_prefix(self._slots[slot], prompt) == 0:
+                slot = min(free, key=self._last_used.__getitem__)
+            self._busy[slot] = True
+            return slot
+
+    def _release_slot(self, slot, prompt):
+        with self._lock:
+            self._slots[slot] = prompt
+            self._last_used[slot] = next(self._clock)
+            self._busy[slot] = False
+        self._free.release()
+
+    def generate(self, prompt, max_tokens):
+        """Yield None per decoded token, then llama.cpp-style timings"""
+        self._free.acquire()
+        slot = self._claim_slot(prompt)
+        try:
+            time.sleep(self.overhead())
+            prompt_n = math.ceil(len(prompt) / CHARS_PER_TOKEN)
+            cache_n = min(common_prefix(self._slots[slot], prompt) // CHARS_PER_TOKEN, prompt_n)
+            prompt_ms = (prompt_n - cache_n) / self.prefill_tps * 1000
+            time.sleep(prompt_ms / 1000)
+
+            predicted_n = min(max_tokens, self.completion_tokens or max_tokens)
+            started = time.perf_counter()
+            for i in range(predicted_n):
+                # Sleep to each token's due time so per-token overhead does not add up
+                time.sleep(max(0.0, started + (i + 1) / self.decode_tps - time.perf_counter()))
+                yield None
+            yield {
+                "cache_n": cache_n,
+                "prompt_n": prompt_n - cache_n,
+                "prompt_ms": round(prompt_ms, 3),
+                "predicted_n": predicted_n,
+                "predicted_ms": round(predicted_n / self.decode_tps * 1000, 3),
+                "finish_reason": "length" if predicted_n == max_tokens else "stop"
+            }
+        finally:
+            self._release_slot(slot, prompt)
+
+    def complete(self, prompt, max_tokens):
+        """Simulate a whole completion; return its timings"""
+        *_, timings = self.generate(prompt, max_tokens)
+        return timings
+
+
+def usage(timings):
+    prompt_tokens = timings["cache_n"] + timings["prompt_n"]
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": timings["predicted_n"],
+        "total_tokens": prompt_tokens + timings["predicted_n"],
+        "prompt_tokens_details": {"cached_tokens": timings["cache_n"]}
+    }
+
+
+def completion_response(model, timings):
+    return {
+        "id": f"chatcmpl-stub-{time.time_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": " ".join(["token"] * timings["predicted_n"])},
+            "finish_reason": timings["finish_reason"]
+        }],
+        "usage": usage(timings),
+        "timings": timings
+    }
+
+
+def completion_chunk(completion_id, model, delta, finish_reason=None):
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+
+
+def make_handler(simulator):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, payload, status=200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_event(self, payload):
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            self.wfile.write(f"data: {data}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        def stream(self, model, tokens):
+            """Send a completion as Server-Sent Events, one token per chunk"""
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            # No length up front: the stream ends when the connection closes
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+
+            completion_id = f"chatcmpl-stub-{time.time_ns()}"
+            self.send_event(completion_chunk(completion_id, model, {"role": "assistant", "content": ""}))
+            for timings in tokens:
+                if timings is None:
+                    self.send_event(completion_chunk(completion_id, model, {"content": "token "}))
+            final = completion_chunk(completion_id, model, {}, timings["finish_reason"])
+            final["usage"] = usage(timings)
+            final["timings"] = timings
+            self.send_event(final)
+            self.send_event("[DONE]")
+
+        def do_GET(self):
+            if self.path.rstrip('/').endswith('/models'):
+                self.send_json({"object": "list", "data": [{"id": "stub", "object": "model"}]})
+            else:
+                self.send_json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self.send_json({"error": "not found"}, 404)
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            model = request.get('model', 'stub')
+            tokens = simulator.generate(render_chat(request.get('messages', [])),
+                                        int(request.get('max_tokens') or 16))
+            try:
+                if request.get('stream'):
+                    self.stream(model, tokens)
+                else:
+                    *_, timings = tokens
+                    self.send_json(completion_response(model, timings))
+            finally:
+                tokens.close()
+
+    return Handler
+
+
+def start_server(simulator, host='127.0.0.1', port=0):
+    """Serve in a background thread; return (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(simulator))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='stub-model', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def add_model_arguments(parser):
+    """Simulation options shared with the benchmark runners"""
+    parser.add_argument('--prefill-tps', type=float, default=1000.0, help='Simulated prompt tokens per second')
+    parser.add_argument('--decode-tps', type=float, default=50.0, help='Simulated generated tokens per second')
+    parser.add_argument('--slots', type=int, default=1, help='Requests the model serves at once, each with its own KV cache')
+    parser.add_argument('--model-overhead', default='0', help='Extra latency per request, e.g. lognormal:0.05:0.5')
+    parser.add_argument('--completion-tokens', type=int, help='Tokens after which replies stop (default: max_tokens)')
+
+
+def simulator_from_arguments(args):
+    return ModelSimulator(args.prefill_tps, args.decode_tps, args.slots,
+                          parse_distribution(args.model_overhead), args.completion_tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=12434)
+    add_model_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_server(simulator_from_arguments(args), args.host, args.port)
+    print(f"🧪 Stub model runner at {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
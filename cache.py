@@ -0,0 +1,358 @@
+"""
+In-process caches for MCP lookups and LLM recommendations.
+A thread-safe TTL + LRU cache, optionally backed by an on-disk SQLite store
+so cached GitHub lookups survive restarts, plus single-flight coalescing of
+identical in-flight calls.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from mcp_client import parse_tool_seconds
+
+MISSING = object()
+
+# Tools whose results are safe to reuse, and for how long (seconds)
+DEFAULT_TOOL_TTLS = 'search_users=3600,search_repositories=600'
+
+# GitHub search qualifiers naming a user or organization, whose logins are
+# case-insensitive
+LOGIN_QUALIFIER = re.compile(r'\b(?:user|org):\S+', re.IGNORECASE)
+
+
+class SQLiteStore:
+    """Persistent key/value store with per-entry expiry"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key):
+        """Return (expires_at, value) or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, key, expires_at, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, expires_at, json.dumps(value))
+            )
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL"""
+
+    def __init__(self, maxsize=1024, store=None):
+        self.maxsize = maxsize
+        self.store = store
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _insert(self, key, expires_at, value):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        """Return a live cached value, or default"""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._data[key]
+
+        if self.store is not None:
+            entry = self.store.get(key)
+            if entry is not None and entry[0] > now:
+                with self._lock:
+                    self._insert(key, *entry)
+                    self.hits += 1
+                return entry[1]
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key, value, ttl):
+        """Cache a value for ttl seconds"""
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._insert(key, expires_at, value)
+        if self.store is not None:
+            self.store.set(key, expires_at, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def items(self):
+        """Return a snapshot of live in-memory (key, value) pairs"""
+        now = time.time()
+        with self._lock:
+            return [(k, v) for k, (expires_at, v) in self._data.items() if expires_at > now]
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single execution"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn once per key at a time; concurrent callers share its result"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "shared": self.shared}
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on one event loop"""
+
+    def __init__(self):
+        self._calls = {}
+        self.shared = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Await fn once per key at a time; concurrent callers share its result"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+        # A cancelled caller must not cancel the computation others are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {"in_flight": len(self._calls), "shared": self.shared}
+
+
+def normalize_query(query):
+    """Lowercase the GitHub logins in a search query; the rest keeps its case"""
+    return LOGIN_QUALIFIER.sub(lambda m: m.group(0).lower(), query.strip())
+
+
+def normalize_arguments(arguments):
+    """Canonicalize tool arguments so equivalent lookups share a cache key
+
+    Only search query login qualifiers are known to be case-insensitive;
+    every other argument is kept as given.
+    """
+    if isinstance(arguments, dict) and isinstance(arguments.get("query"), str):
+        return dict(arguments, query=normalize_query(arguments["query"]))
+    return arguments
+
+
+def tool_cache_key(tool_name, arguments):
+    """Build a cache key from a tool name and its normalized arguments"""
+    args = json.dumps(normalize_arguments(arguments), sort_keys=True, separators=(',', ':'))
+    return f"{tool_name}:{args}"
+
+
+class ToolCache:
+    """Caches successful MCP tool results for tools with a configured TTL"""
+
+    def __init__(self, ttls, maxsize=1024, path=None):
+        self.ttls = dict(ttls)
+        self.cache = TTLCache(maxsize, SQLiteStore(path) if path else None)
+
+    def call(self, call_tool, tool_name, arguments):
+        """Return a cached result or call call_tool(tool_name, arguments)"""
+        ttl = self.ttls.get(tool_name)
+        if not ttl:
+            return call_tool(tool_name, arguments)
+
+        key = tool_cache_key(tool_name, arguments)
+        result = self.cache.get(key, MISSING)
+        if result is not MISSING:
+            return result
+
+        result = call_tool(tool_name, arguments)
+        if result.get("success"):
+            self.cache.set(key, result, ttl)
+        return result
+
+    async def call_async(self, call_tool, tool_name, arguments):
+        """Async variant of call() for coroutine call_tool functions"""
+        ttl = self.ttls.get(tool_name)
+        if not ttl:
+            return await call_tool(tool_name, arguments)
+
+        key = tool_cache_key(tool_name, arguments)
+        result = self.cache.get(key, MISSING)
+        if result is not MISSING:
+            return result
+
+        result = await call_tool(tool_name, arguments)
+        if result.get("success"):
+            self.cache.set(key, result, ttl)
+        return result
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def create_tool_cache():
+    """Create the MCP tool cache from environment configuration"""
+    return ToolCache(
+        parse_tool_seconds(os.getenv('MCP_CACHE_TTLS', DEFAULT_TOOL_TTLS)),
+        maxsize=int(os.getenv('MCP_CACHE_SIZE', '1024')),
+        path=os.getenv('MCP_CACHE_PATH') or None
+    )
+
+
+def profile_features(languages, topics, frameworks):
+    """Tagged, case-folded feature set describing a developer profile"""
+    return frozenset(
+        [f"lang:{x.lower()}" for x in languages] +
+        [f"topic:{x.lower()}" for x in topics] +
+        [f"tech:{x.lower()}" for x in frameworks]
+    )
+
+
+def profile_fingerprint(features, trends_context):
+    """Canonical cache key for a profile feature set and trends context"""
+    canonical = json.dumps([sorted(features), trends_context], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class RecommendationCache:
+    """Caches LLM recommendations by profile fingerprint
+
+    With a similarity threshold set, a miss falls back to the most similar
+    cached profile (Jaccard over languages, topics and technologies) generated
+    under the same trends context.
+    """
+
+    def __init__(self, ttl=3600, maxsize=256, similarity=None):
+        self.ttl = ttl
+        self.similarity = similarity
+        self.cache = TTLCache(maxsize)
+        self.near_hits = 0
+
+    def get(self, features, trends_context):
+        """Return cached recommendations for a profile, or None"""
+        entry = self.cache.get(profile_fingerprint(features, trends_context))
+        if entry is not None:
+            return entry["recommendations"]
+
+        if not self.similarity:
+            return None
+
+        best_score, best = 0.0, None
+        for _, candidate in self.cache.items():
+            if candidate["trends"] != trends_context:
+                continue
+            score = jaccard(features, candidate["features"])
+            if score > best_score:
+                best_score, best = score, candidate
+        if best is not None and best_score >= self.similarity:
+            self.near_hits += 1
+            return best["recommendations"]
+        return None
+
+    def set(self, features, trends_context, recommendations):
+        self.cache.set(
+            profile_fingerprint(features, trends_context),
+            {"features": features, "trends": trends_context, "recommendations": recommendations},
+            self.ttl
+        )
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats["near_hits"] = self.near_hits
+        return stats
+
+
+def create_recommendation_cache():
+    """Create the recommendation cache from environment configuration"""
+    return RecommendationCache(
+        ttl=float(os.getenv('REC_CACHE_TTL', '3600')),
+        maxsize=int(os.getenv('REC_CACHE_SIZE', '256')),
+        similarity=float(os.getenv('REC_CACHE_SIMILARITY', '0')) or None
+    )
@@ -5,13 +5,126 @@ An AI agent that solves coding problems using Node.js sandbox MCP server.
 Supports Docker Model Runner (local models), OpenAI, and Docker Offload.
 """
 
+import argparse
+import hashlib
 import os
+import sys
 import json
-import subprocess
 import requests
 import time
 from datetime import datetime
 
+from artifact_cache import artifact_key, create_artifact_cache
+from batch import run_stages
+from llm_client import get_ai_client
+from mcp_client import get_mcp_client
+from prompts import PromptTemplate, Section, context_budget
+from sandbox_pool import DEFAULT_IMAGE, get_sandbox_pool
+
+# Prompts are compiled once; problem text, code and sandbox output are capped
+# so a large result never overflows the model context
+CODE_MAX_TOKENS = 800
+ANALYSIS_MAX_TOKENS = 200
+
+CODE_PROMPT = PromptTemplate("""
+    Write JavaScript code to solve this problem: {problem}
+
+    Requirements:
+    - Write clean, well-commented JavaScript code
+    - Include console.log statements to show the results
+    - Make it runnable in a Node.js environment
+    - Don't use any external dependencies unless absolutely necessary
+    - If you need to save files, use fs/promises module
+    - Provide a complete working solution
+
+    Return only the JavaScript code, no explanations or markdown formatting.
+    """, sections={
+    "problem": Section(2000, 200, 'middle')
+})
+
+REPAIR_PROMPT = PromptTemplate("""
+    This JavaScript solution failed when run in Node.js.
+
+    Problem: {problem}
+
+    Code:
+    {code}
+
+    Error:
+    {error}
+
+    Fix the code so that it runs and solves the problem. Keep the same
+    requirements: console.log the results, no external dependencies unless
+    absolutely necessary, use fs/promises to save files.
+
+    Return only the corrected JavaScript code, no explanations or markdown formatting.
+    """, sections={
+    "problem": Section(1000, 100, 'middle'),
+    "code": Section(2000, 200, 'middle'),
+    "error": Section(800, 100, 'middle')
+})
+
+ANALYSIS_PROMPT = PromptTemplate("""
+    Analyze this coding solution:
+    
+    Problem: {problem}
+    Code: {code}
+    Execution Status: {status}
+    Details: {details}
+    
+    Provide a brief analysis of:
+    1. Whether the solution correctly addresses the problem
+    2. Code quality and approach
+    3. Any improvements or issues
+    
+    Keep it concise (2-3 sentences).
+    """, sections={
+    "problem": Section(500, 100, 'middle'),
+    "code": Section(2000, 200, 'middle'),
+    "details": Section(1000, 100, 'middle')
+})
+
+try:
+    artifact_cache = create_artifact_cache()
+except OSError as e:
+    print(f"⚠️ Artifact cache disabled: {e}")
+    artifact_cache = None
+
+def cached_artifact(kind, key):
+    """Stored artifact, or None on a miss or with the cache disabled"""
+    if artifact_cache is None:
+        return None
+    return artifact_cache.get(kind, key)
+
+def store_artifact(kind, key, value):
+    if artifact_cache is None:
+        return
+    try:
+        artifact_cache.put(kind, key, value)
+    except OSError as e:
+        print(f"⚠️ Could not cache {kind}: {e}")
+
+def drop_artifact(kind, key):
+    if artifact_cache is not None:
+        artifact_cache.delete(kind, key)
+
+def settle_code(pending, execution):
+    """Cache generated code once it has run successfully; drop cached code that failed"""
+    if pending is None:
+        return
+    if execution['success'] and 'value' in pending:
+        store_artifact('code', pending['key'], pending['value'])
+    elif not execution['success'] and not execution.get('sandbox_error') and 'value' not in pending:
+        print("🗑️ Cached code failed, removing it from the cache")
+        drop_artifact('code', pending['key'])
+
+def render_prompt(template, max_tokens, **values):
+    """Render a compiled prompt within the context left for a max_tokens reply"""
+    prompt = template.render(budget=context_budget(max_tokens), **values)
+    if prompt.truncated:
+        print(f"✂️ Trimmed {', '.join(prompt.truncated)} (prompt is {prompt.tokens} tokens)")
+    return prompt.text
+
 def wait_for_model_service():
     """Wait for the model service to be ready"""
     model_provider = os.getenv('MODEL_PROVIDER', 'docker-model-runner').lower()
@@ -27,22 +140,19 @@ def wait_for_model_service():
     return True
 
 def create_ai_client():
-    """Create appropriate AI client based on MODEL_PROVIDER"""
+    """Return the shared AI client for the configured MODEL_PROVIDER"""
     provider = os.getenv('MODEL_PROVIDER', 'docker-model-runner').lower()
     
     if provider == 'openai':
-        from openai import OpenAI
-        return OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        return get_ai_client(provider, api_key=os.getenv('OPENAI_API_KEY'))
     
     elif provider in ['docker-model-runner', 'local']:
-        from openai import OpenAI
         # Use OpenAI-compatible endpoint from environment
         base_url = os.getenv('OPENAI_BASE_URL', 'http://host.docker.internal/engines/llama.cpp/')
         api_key = os.getenv('OPENAI_API_KEY', 'irrelevant')
         
-        print(f"🔗 Connecting to Docker Model Runner at: {base_url}")
-        
-        return OpenAI(
+        return get_ai_client(
+            provider,
             base_url=base_url,
             api_key=api_key
         )
@@ -50,9 +160,12 @@ def create_ai_client():
     else:
         raise ValueError(f"Unsupported MODEL_PROVIDER: {provider}")
 
-def generate_code_solution(problem):
-    """Generate JavaScript code to solve the given problem"""
-    client = create_ai_client()
+def generate_code_solution(problem, failed_code=None, error=None):
+    """Generate JavaScript code for the problem, or a fix for failed_code
+
+    Returns (code, tokens used, pending cache entry). The entry is passed to
+    settle_code() once the code has run, so only code that works is cached.
+    """
     provider = os.getenv('MODEL_PROVIDER', 'docker-model-runner').lower()
     
     # Use appropriate model name based on provider
@@ -64,171 +177,133 @@ def generate_code_solution(problem):
     
     print(f"🤖 Using model: {model_name}")
     
-    prompt = f"""
-    Write JavaScript code to solve this problem: {problem}
-
-    Requirements:
-    - Write clean, well-commented JavaScript code
-    - Include console.log statements to show the results
-    - Make it runnable in a Node.js environment
-    - Don't use any external dependencies unless absolutely necessary
-    - If you need to save files, use fs/promises module
-    - Provide a complete working solution
-
-    Return only the JavaScript code, no explanations or markdown formatting.
-    """
+    if failed_code is None:
+        prompt = render_prompt(CODE_PROMPT, CODE_MAX_TOKENS, problem=problem)
+    else:
+        prompt = render_prompt(REPAIR_PROMPT, CODE_MAX_TOKENS, problem=problem, code=failed_code, error=error)
     
+    # The rendered prompt covers the problem, the template version and any
+    # failure being repaired
+    key = artifact_key('code', model_name, CODE_MAX_TOKENS, prompt)
+    cached = cached_artifact('code', key)
+    if cached is not None:
+        print("♻️ Reusing cached code for this prompt and model")
+        return cached['code'], 0, {'key': key}
+    
+    client = create_ai_client()
     try:
         response = client.chat.completions.create(
             model=model_name,
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=800,
+            max_tokens=CODE_MAX_TOKENS,
             temperature=0.3
         )
-        return response.choices[0].message.content.strip()
+        tokens = response.usage.total_tokens if response.usage else 0
+        code = response.choices[0].message.content.strip()
+        return code, tokens, {'key': key, 'value': {'code': code, 'model': model_name, 'tokens': tokens}}
     except Exception as e:
-        return f"// Error generating code: {e}"
+        return f"// Error generating code: {e}", 0, None
+
+def tool_execution(result, execution_time=0):
+    """Execution result for a run_js tool result, which reports script errors with isError"""
+    text = ''.join(
+        item.get('text', '') for item in result.get('content') or [] if isinstance(item, dict)
+    )
+    if result.get('isError'):
+        return {
+            'success': False,
+            'error': text or 'Execution failed',
+            'output': '',
+            'execution_time': execution_time
+        }
+    return {
+        'success': True,
+        'output': text,
+        'error': '',
+        'execution_time': execution_time
+    }
 
 def execute_code_via_mcp_gateway(code):
     """Execute JavaScript code using MCP Gateway with node-code-sandbox server"""
+    client = get_mcp_client(os.getenv('MCPGATEWAY_URL', 'http://mcp-gateway:8811'))
+    timeout = client.timeout_for("run_js")
+    
     try:
-        mcp_gateway_url = os.getenv('MCPGATEWAY_URL', 'http://mcp-gateway:8811')
-        
-        # Create MCP request for node-code-sandbox server
-        mcp_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
+        # Send tools/call request for node-code-sandbox server
+        response = client.post(
+            "tools/call",
+            {
                 "name": "run_js",
                 "arguments": {
                     "code": code
                 }
-            }
-        }
-        
-        # Send request to MCP Gateway
-        response = requests.post(
-            f"{mcp_gateway_url}/mcp",
-            json=mcp_request,
-            timeout=60,
-            headers={'Content-Type': 'application/json'}
+            },
+            timeout=timeout
         )
         
         if response.status_code == 200:
             result = response.json()
             if "result" in result:
-                return {
-                    'success': True,
-                    'output': result["result"].get('content', ''),
-                    'error': '',
-                    'execution_time': 0
-                }
+                return tool_execution(result["result"])
             else:
                 return {
                     'success': False,
                     'error': f"MCP Error: {result.get('error', 'Unknown error')}",
-                    'output': ''
+                    'output': '',
+                    'sandbox_error': True
                 }
         else:
             return {
                 'success': False,
                 'error': f"HTTP {response.status_code}: {response.text}",
-                'output': ''
+                'output': '',
+                'sandbox_error': True
             }
             
     except requests.exceptions.Timeout:
         return {
             'success': False,
-            'error': "Execution timed out (60s limit)",
+            'error': f"Execution timed out ({timeout:g}s limit)",
             'output': ''
         }
     except Exception as e:
         return {
             'success': False,
             'error': f"Failed to execute code via MCP Gateway: {e}",
-            'output': ''
+            'output': '',
+            'sandbox_error': True
         }
 
 def execute_code_direct_docker(code):
-    """Fallback: Execute JavaScript code directly using Docker node-code-sandbox"""
-    try:
-        # Run the node-code-sandbox MCP server via Docker with the code
-        docker_cmd = [
-            "docker", "run", "--rm", "-i",
-            "-v", "/var/run/docker.sock:/var/run/docker.sock",
-            "-v", f"{os.getcwd()}/sandbox-output:/root",
-            "-e", "FILES_DIR=/root",
-            "mcp/node-code-sandbox"
-        ]
-        
-        # Create MCP request for execution
-        mcp_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": "run_js",
-                "arguments": {
-                    "code": code
-                }
-            }
-        }
-        
-        # Execute the request
-        process = subprocess.run(
-            docker_cmd,
-            input=json.dumps(mcp_request),
-            text=True,
-            capture_output=True,
-            timeout=60
-        )
-        
-        if process.returncode == 0:
-            try:
-                response = json.loads(process.stdout)
-                if "result" in response:
-                    result = response["result"]
-                    return {
-                        'success': True,
-                        'output': result.get('content', [{}])[0].get('text', ''),
-                        'error': '',
-                        'execution_time': 0
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'error': f"MCP Error: {response.get('error', 'Unknown error')}",
-                        'output': ''
-                    }
-            except json.JSONDecodeError:
-                return {
-                    'success': True,
-                    'output': process.stdout,
-                    'error': process.stderr,
-                    'execution_time': 0
-                }
-        else:
-            return {
-                'success': False,
-                'error': f"Docker process failed: {process.stderr}",
-                'output': process.stdout
-            }
-    except subprocess.TimeoutExpired:
-        return {
-            'success': False,
-            'error': "Execution timed out (60s limit)",
-            'output': ''
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'error': f"Failed to execute code: {e}",
-            'output': ''
-        }
+    """Fallback: Execute JavaScript code in a warm node-code-sandbox worker over stdio"""
+    started = time.perf_counter()
+    result = get_sandbox_pool().call_tool("run_js", {"code": code})
+    execution_time = time.perf_counter() - started
+    
+    if result["success"]:
+        return tool_execution(result["data"], execution_time)
+    
+    error = result["error"]
+    if isinstance(error, dict):
+        error = f"MCP Error: {error.get('message', error)}"
+    return {
+        'success': False,
+        'error': error,
+        'output': '',
+        'execution_time': execution_time,
+        # Only a timed-out execution is the script's fault
+        'sandbox_error': not result.get('timed_out')
+    }
 
 def execute_code_in_sandbox(code):
     """Execute JavaScript code using MCP Gateway or fallback to direct Docker"""
+    code_hash = hashlib.sha256(code.encode('utf-8')).hexdigest()
+    key = artifact_key('execution', os.getenv('SANDBOX_IMAGE', DEFAULT_IMAGE), code_hash)
+    cached = cached_artifact('execution', key)
+    if cached is not None:
+        print("♻️ Reusing cached execution result for this code")
+        return dict(cached, cached=True)
+    
     # Try MCP Gateway first
     result = execute_code_via_mcp_gateway(code)
     
@@ -237,6 +312,9 @@ def execute_code_in_sandbox(code):
         print("⚠️ MCP Gateway failed, falling back to direct Docker execution...")
         result = execute_code_direct_docker(code)
     
+    # Failures may be the sandbox's rather than the code's, so only successes are reused
+    if result['success']:
+        store_artifact('execution', key, result)
     return result
 
 def analyze_results(problem, code, execution_result):
@@ -259,33 +337,108 @@ def analyze_results(problem, code, execution_result):
         status = "❌ Failed"
         details = f"Error: {execution_result['error']}"
     
-    analysis_prompt = f"""
-    Analyze this coding solution:
+    analysis_prompt = render_prompt(
+        ANALYSIS_PROMPT, ANALYSIS_MAX_TOKENS,
+        problem=problem, code=code, status=status, details=details
+    )
     
-    Problem: {problem}
-    Code: {code}
-    Execution Status: {status}
-    Details: {details}
-    
-    Provide a brief analysis of:
-    1. Whether the solution correctly addresses the problem
-    2. Code quality and approach
-    3. Any improvements or issues
-    
-    Keep it concise (2-3 sentences).
-    """
+    key = artifact_key('analysis', model_name, ANALYSIS_MAX_TOKENS, analysis_prompt)
+    cached = cached_artifact('analysis', key)
+    if cached is not None:
+        return cached['analysis']
     
     try:
         response = client.chat.completions.create(
             model=model_name,
             messages=[{"role": "user", "content": analysis_prompt}],
-            max_tokens=200,
+            max_tokens=ANALYSIS_MAX_TOKENS,
             temperature=0.3
         )
-        return response.choices[0].message.content.strip()
+        analysis = response.choices[0].message.content.strip()
+        store_artifact('analysis', key, {'analysis': analysis, 'model': model_name})
+        return analysis
     except Exception as e:
         return f"Could not analyze results: {e}"
 
+def generate_attempt(problem, failed=None):
+    """Ask the model for code, or for a fix of a failed attempt; return the new attempt"""
+    started = time.perf_counter()
+    if failed is None:
+        code, tokens, pending = generate_code_solution(problem)
+    else:
+        code, tokens, pending = generate_code_solution(problem, failed['code'], failed['execution']['error'])
+    return {
+        'code': code,
+        'tokens': tokens,
+        'pending': pending,
+        'generate_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+
+def solve_problem(problem, max_repairs, attempt=None):
+    """Execute code, feeding each failure back to the model for up to max_repairs fixes
+    
+    attempt is an already generated first attempt. Returns every attempt;
+    the last one with an 'execution' is the answer.
+    """
+    attempts = [attempt or generate_attempt(problem)]
+    while True:
+        attempt = attempts[-1]
+        if attempt['code'].startswith("// Error"):
+            return attempts
+        
+        started = time.perf_counter()
+        attempt['execution'] = execute_code_in_sandbox(attempt['code'])
+        attempt['execute_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        settle_code(attempt.pop('pending', None), attempt['execution'])
+        
+        if attempt['execution']['success'] or len(attempts) > max_repairs:
+            return attempts
+        if attempt['execution'].get('sandbox_error'):
+            # The sandbox failed, not the code: a repair would not help
+            print(f"⚠️ Sandbox unavailable, not repairing: {attempt['execution']['error'][:200]}")
+            return attempts
+        print(f"🔧 Attempt {len(attempts)} failed: {attempt['execution']['error'][:200]}")
+        print("🧠 Asking the model to repair the code...")
+        attempts.append(generate_attempt(problem, attempt))
+
+def final_attempt(attempts):
+    """Latest attempt that was executed, or None if no code could be generated"""
+    return next((a for a in reversed(attempts) if 'execution' in a), None)
+
+def attempt_log(attempts):
+    """Per-attempt timings, token use and outcome, without the code"""
+    return [
+        {
+            'attempt': number,
+            'generate_ms': attempt['generate_ms'],
+            'execute_ms': attempt.get('execute_ms'),
+            'tokens': attempt['tokens'],
+            'success': attempt.get('execution', {}).get('success', False),
+            'error': attempt['execution']['error'] if 'execution' in attempt else attempt['code']
+        }
+        for number, attempt in enumerate(attempts, 1)
+    ]
+
+def max_repair_attempts():
+    return int(os.getenv('MAX_REPAIR_ATTEMPTS', '2'))
+
+def analysis_enabled():
+    return os.getenv('ANALYZE_RESULTS', 'true').lower() == 'true'
+
+def result_record(problem, code, execution_result, analysis, attempts=()):
+    """Saved result of solving one problem"""
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'problem': problem,
+        'model_provider': os.getenv('MODEL_PROVIDER', 'docker-model-runner'),
+        'model_name': os.getenv('MODEL_NAME', 'ai/qwen3:8B-Q4_0'),
+        'code': code,
+        'execution': execution_result,
+        'analysis': analysis,
+        'attempts': attempt_log(attempts),
+        'mcp_server': 'node-code-sandbox via MCP Gateway'
+    }
+
 def main():
     problem = os.getenv('PROBLEM', 'Calculate the first 10 Fibonacci numbers')
     provider = os.getenv('MODEL_PROVIDER', 'docker-model-runner')
@@ -301,27 +454,39 @@ def main():
     os.makedirs('/app/output', exist_ok=True)
     os.makedirs('/app/sandbox-output', exist_ok=True)
     
+    # Start sandbox workers while the model loads so a fallback execution
+    # does not wait for a container
+    if os.getenv('SANDBOX_PREWARM', 'false').lower() == 'true':
+        get_sandbox_pool().warm()
+    
     # Wait for model service
     wait_for_model_service()
     
-    # Generate code solution
+    if provider.lower() in ['docker-model-runner', 'local']:
+        base_url = os.getenv('OPENAI_BASE_URL', 'http://host.docker.internal/engines/llama.cpp/')
+        print(f"🔗 Connecting to Docker Model Runner at: {base_url}")
+    
+    # Generate code and run it in the sandbox, repairing failures
     print("🧠 Generating JavaScript solution...")
-    code = generate_code_solution(problem)
+    started = time.perf_counter()
+    attempts = solve_problem(problem, max_repair_attempts())
+    final = final_attempt(attempts)
     
-    if code.startswith("// Error"):
+    if final is None:
         print("❌ Failed to generate code")
-        print(f"Error: {code}")
+        print(f"Error: {attempts[-1]['code']}")
         return
     
-    print("✅ Code generated successfully")
-    
-    # Execute code in sandbox
-    print("🏃 Executing code in Node.js sandbox...")
-    execution_result = execute_code_in_sandbox(code)
+    code = final['code']
+    execution_result = final['execution']
+    print(f"⏱️ {len(attempts)} attempt(s), {sum(a['tokens'] for a in attempts)} tokens, "
+          f"{time.perf_counter() - started:.1f}s")
     
     # Analyze results
-    print("🔍 Analyzing results...")
-    analysis = analyze_results(problem, code, execution_result)
+    analysis = None
+    if analysis_enabled():
+        print("🔍 Analyzing results...")
+        analysis = analyze_results(problem, code, execution_result)
     
     # Save the generated code
     with open('/app/output/solution.js', 'w') as f:
@@ -333,16 +498,7 @@ def main():
         f.write(code)
     
     # Save execution results and analysis
-    result_data = {
-        'timestamp': datetime.now().isoformat(),
-        'problem': problem,
-        'model_provider': provider,
-        'model_name': model_name,
-        'code': code,
-        'execution': execution_result,
-        'analysis': analysis,
-        'mcp_server': 'node-code-sandbox via MCP Gateway'
-    }
+    result_data = result_record(problem, code, execution_result, analysis, attempts)
     
     with open('/app/output/result.json', 'w') as f:
         json.dump(result_data, f, indent=2)
@@ -373,9 +529,16 @@ def main():
             if execution_result['output']:
                 f.write(f"Partial Output: {execution_result['output']}\n")
         
+        f.write(f"\nAttempts:\n")
+        f.write("-" * 20 + "\n")
+        for attempt in result_data['attempts']:
+            outcome = "succeeded" if attempt['success'] else "failed"
+            f.write(f"{attempt['attempt']}. {outcome} (generate {attempt['generate_ms']} ms, "
+                    f"execute {attempt['execute_ms']} ms, {attempt['tokens']} tokens)\n")
+        
         f.write(f"\nAnalysis:\n")
         f.write("-" * 20 + "\n")
-        f.write(analysis + "\n")
+        f.write((analysis or "Skipped (ANALYZE_RESULTS=false)") + "\n")
     
     print(f"💾 Results saved to ./output/")
     print(f"📄 Code saved to: ./output/solution.js")
@@ -392,5 +555,129 @@ def main():
     else:
         print(f"❌ Execution failed: {execution_result['error']}")
 
+def read_problems(path):
+    """Read problems from a JSONL file ("-" for stdin)
+    
+    Each line is a JSON string, an object with "problem" (or "title" and
+    "body", as in requests.jsonl) and an optional "id" or "request_id", or
+    plain text.
+    """
+    if path == '-':
+        lines = sys.stdin.readlines()
+    else:
+        with open(path) as f:
+            lines = f.readlines()
+    
+    problems = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            value = line
+        if isinstance(value, dict):
+            problem_id = value.get('id') or value.get('request_id') or str(number)
+            problem = value.get('problem') or '\n\n'.join(
+                part for part in (value.get('title'), value.get('body')) if part
+            )
+        else:
+            problem_id, problem = str(number), str(value)
+        if problem.strip():
+            problems.append({'id': str(problem_id), 'problem': problem.strip(), 'timings_ms': {}})
+    return problems
+
+def timed_stage(name, function):
+    """Pipeline stage that runs function on a problem and records how long it took"""
+    def stage(job):
+        started = time.perf_counter()
+        try:
+            function(job)
+        finally:
+            job['timings_ms'][name] = round((time.perf_counter() - started) * 1000, 1)
+        return job
+    return stage
+
+def generate_stage(job):
+    job['attempts'] = [generate_attempt(job['problem'])]
+    if job['attempts'][0]['code'].startswith("// Error"):
+        raise RuntimeError(job['attempts'][0]['code'][3:])
+
+def execute_stage(job):
+    # Repairs are generated here rather than sent back up the pipeline, so
+    # the bounded queues never wait on each other in a cycle
+    job['attempts'] = solve_problem(job['problem'], max_repair_attempts(), job['attempts'][0])
+    final = final_attempt(job['attempts'])
+    job['code'] = final['code']
+    job['execution'] = final['execution']
+
+def analyze_stage(job):
+    job['analysis'] = analyze_results(job['problem'], job['code'], job['execution'])
+
+def batch_main(argv):
+    """CLI: solve a JSONL file of problems and append one JSON result per line"""
+    parser = argparse.ArgumentParser(
+        prog='coding-agent.py batch',
+        description='Solve many coding problems with a pipelined generate/execute/analyze run'
+    )
+    parser.add_argument('input', help='JSONL file of problems ("-" for stdin)')
+    parser.add_argument('-o', '--output', default='/app/output/results.jsonl',
+                        help='JSONL file to append results to (default: /app/output/results.jsonl)')
+    args = parser.parse_args(argv)
+    
+    problems = read_problems(args.input)
+    print(f"📋 {len(problems)} problems from {args.input}")
+    
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(output_dir, exist_ok=True)
+    
+    if os.getenv('SANDBOX_PREWARM', 'false').lower() == 'true':
+        get_sandbox_pool().warm()
+    wait_for_model_service()
+    
+    # The model generates the next problems while the sandbox runs earlier ones
+    stages = [
+        (timed_stage('generate', generate_stage), int(os.getenv('AGENT_GENERATE_WORKERS', '2'))),
+        (timed_stage('execute', execute_stage), int(os.getenv('AGENT_EXECUTE_WORKERS', '2')))
+    ]
+    if analysis_enabled():
+        stages.append((timed_stage('analyze', analyze_stage), int(os.getenv('AGENT_ANALYZE_WORKERS', '1'))))
+    
+    started = time.perf_counter()
+    solved = 0
+    with open(args.output, 'a') as results:
+        for job, error in run_stages(problems, stages, int(os.getenv('AGENT_QUEUE_SIZE', '4'))):
+            if error is None:
+                record = result_record(job['problem'], job['code'], job['execution'], job.get('analysis'),
+                                       job['attempts'])
+                record['success'] = job['execution']['success']
+            else:
+                record = {
+                    'timestamp': datetime.now().isoformat(),
+                    'problem': job['problem'],
+                    'success': False,
+                    'error': str(error),
+                    'attempts': attempt_log(job.get('attempts', ()))
+                }
+            record['id'] = job['id']
+            record['timings_ms'] = job['timings_ms']
+            results.write(json.dumps(record) + "\n")
+            results.flush()
+            
+            solved += record['success']
+            print(f"{'✅' if record['success'] else '❌'} {job['id']} finished in "
+                  f"{sum(job['timings_ms'].values()) / 1000:.1f}s")
+    
+    print(f"📊 Batch finished: {solved}/{len(problems)} solved in {time.perf_counter() - started:.1f}s")
+    print(f"💾 Results appended to {args.output}")
+    if artifact_cache is not None:
+        stats = artifact_cache.stats()
+        print(f"♻️ Artifact cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['bytes'] / 1024 / 1024:.1f} MB")
+    return 0 if solved == len(problems) else 1
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ['batch']:
+        sys.exit(batch_main(sys.argv[2:]))
     main()
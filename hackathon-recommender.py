@@ -4,62 +4,176 @@ Simple HTML Hackathon Project Recommender - No WebSockets!
 Following compose-for-agents pattern with basic HTML interface.
 """
 
-from flask import Flask, render_template_string, request, jsonify
-import requests
+from flask import Flask, Response, g, render_template_string, request, jsonify, stream_with_context
+from a2wsgi import WSGIMiddleware
+import argparse
+import asyncio
+import contextlib
 import json
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from openai import OpenAI
+
+from admission import PRIORITY_BATCH, PRIORITY_INTERACTIVE, QueueFull, create_admission_controller
+from batch import Checkpoint, dedupe_usernames, read_usernames, run_pipeline
+from cache import (
+    AsyncSingleFlight, SingleFlight, create_recommendation_cache, create_tool_cache,
+    profile_features, profile_fingerprint, tool_cache_key
+)
+from ingest import (
+    SkillAggregate, ingest, ingest_async, ingest_since, ingest_since_async, ingest_settings, ingest_steps,
+    repository_pages, repository_pages_async, stable_pages_setting
+)
+from ideas import create_idea_index, parse_recommendations, profile_query, render_ideas
+from jobs import JobManager, create_job_store, public_job
+from llm_client import get_ai_client, get_async_ai_client
+from mcp_client import get_async_mcp_client, get_mcp_client
+from metrics import (
+    CONTENT_TYPE, REGISTRY, Generation, annotate, begin, end, record_stage, request_id, stage,
+    timed_tool, timed_tool_async, traced, watch_cache
+)
+from profile_store import create_profile_store
+from recommendations import RECOMMENDATION_MAX_TOKENS, prompt_layout, recommendation_messages, reply_tokens
+from skill_profile import half_life_setting
+from skills import load_skill_matcher
+from trends import TrendsRefresher
 
 app = Flask(__name__)
 
+# Shared pool for fanning out independent MCP calls within a request
+mcp_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('MCP_FANOUT_WORKERS', '10')),
+    thread_name_prefix='mcp'
+)
+
+# Cache for repeat GitHub lookups (search_users, search_repositories)
+mcp_cache = create_tool_cache()
+
+# Cache for generated recommendations, keyed on the extracted profile
+recommendation_cache = create_recommendation_cache()
+
+watch_cache('mcp', mcp_cache.stats)
+watch_cache('recommendations', recommendation_cache.stats)
+
+# Technology taxonomy, compiled once (SKILL_TAXONOMY overrides the bundled file)
+skill_matcher = load_skill_matcher()
+
+# Repository pagination: page size, repo cap, pages in flight, early stop
+INGEST = ingest_settings()
+INGEST_STABLE_PAGES = stable_pages_setting()
+
+# Recency half-life for weighting repositories in a profile
+PROFILE_HALF_LIFE_DAYS = half_life_setting()
+
+# Stored profiles: returning users only fetch repositories updated since their
+# last analysis, with a full rebuild every PROFILE_REBUILD_DAYS (opened by
+# start_services())
+profile_store = None
+PROFILE_REBUILD_INTERVAL = float(os.getenv('PROFILE_REBUILD_DAYS', '7')) * 86400
+PROFILE_DELTA_PER_PAGE = int(os.getenv('PROFILE_DELTA_PER_PAGE', '10'))
+
+# GitHub user fields kept once a user is resolved
+USER_FIELDS = ('login', 'public_repos', 'bio')
+
+# Local idea corpus: the model personalizes retrieved candidates, and
+# interactive requests get the candidates directly when the model is saturated
+idea_index = create_idea_index()
+IDEA_CANDIDATES = int(os.getenv('IDEA_CANDIDATES', '6'))
+IDEAS_FALLBACK = os.getenv('IDEAS_FALLBACK', 'true').lower() == 'true'
+IDEAS_FALLBACK_QUEUE = int(os.getenv('IDEAS_FALLBACK_QUEUE', '4'))
+if IDEAS_FALLBACK_QUEUE < 0:
+    raise ValueError("IDEAS_FALLBACK_QUEUE must be 0 or more; set IDEAS_FALLBACK=false to disable the fallback")
+
+# Caps concurrent completions against the model runner
+admission = create_admission_controller()
+
+# Concurrent identical requests share one in-flight computation
+mcp_flight = SingleFlight()
+analysis_flight = SingleFlight()
+recommendation_flight = SingleFlight()
+
+# Coalescing for the async (ASGI) serving mode, one event loop per worker
+mcp_flight_async = AsyncSingleFlight()
+analysis_flight_async = AsyncSingleFlight()
+
 def get_mcp_gateway_url():
     """Get MCP Gateway URL"""
     return os.getenv('MCPGATEWAY_ENDPOINT', 'http://mcp-gateway:8811')
 
-def create_ai_client():
-    """Create AI client for recommendations"""
+def ai_client_settings():
+    """Provider, base URL and API key for the recommendation model"""
     provider = os.getenv('MODEL_PROVIDER', 'docker-model-runner')
     
     if provider == 'openai':
-        return OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        return provider, None, os.getenv('OPENAI_API_KEY')
     else:
         base_url = os.getenv('OPENAI_BASE_URL', 'http://model-runner.docker.internal:12434/engines/llama.cpp/v1')
-        return OpenAI(
-            base_url=base_url,
-            api_key=os.getenv('OPENAI_API_KEY', 'irrelevant')
-        )
+        return provider, base_url, os.getenv('OPENAI_API_KEY', 'irrelevant')
+
+def create_ai_client():
+    """Return the shared AI client for recommendations"""
+    return get_ai_client(*ai_client_settings())
+
+def create_async_ai_client():
+    """Return the shared asyncio AI client for recommendations"""
+    return get_async_ai_client(*ai_client_settings())
 
 def call_mcp_tool(tool_name, arguments):
-    """Call MCP tool via gateway"""
-    try:
-        gateway_url = get_mcp_gateway_url()
-        
-        response = requests.post(
-            f"{gateway_url}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                }
-            },
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            if "result" in result:
-                return {"success": True, "data": result["result"]}
-            else:
-                return {"success": False, "error": result.get("error", "Unknown error")}
-        else:
-            return {"success": False, "error": f"HTTP {response.status_code}"}
-            
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    """Call MCP tool via gateway, reusing cached and in-flight results where allowed"""
+    client = get_mcp_client(get_mcp_gateway_url())
+    return mcp_flight.do(
+        tool_cache_key(tool_name, arguments),
+        mcp_cache.call, timed_tool(client.call_tool), tool_name, arguments
+    )
+
+async def call_mcp_tool_async(tool_name, arguments):
+    """Async call_mcp_tool for the ASGI serving mode"""
+    client = get_async_mcp_client(get_mcp_gateway_url())
+    return await mcp_flight_async.do(
+        tool_cache_key(tool_name, arguments),
+        mcp_cache.call_async, timed_tool_async(client.call_tool), tool_name, arguments
+    )
+
+# Trend research runs in the background (started by start_services());
+# requests only read the snapshot
+trends = TrendsRefresher(
+    call_mcp_tool,
+    ["AI hackathon 2025 trending projects"],
+    interval=float(os.getenv('TRENDS_REFRESH_INTERVAL', '900')),
+    fallback="Current hackathon trends: AI agents, developer tools, climate tech, web3, and accessibility solutions."
+)
+
+# Scraped and polled constantly, so left out of request logs and metrics
+UNTRACED_PATHS = ('/metrics', '/health')
+
+@app.before_request
+def ensure_services():
+    """Start services on the first request when a WSGI server imported the app"""
+    if jobs is None:
+        start_services()
+
+@app.before_request
+def begin_trace():
+    """Start the request's trace, reusing the caller's X-Request-ID if it sent one"""
+    if request.path not in UNTRACED_PATHS:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        g.trace = begin(route, request.headers.get('X-Request-ID'))
+
+@app.after_request
+def end_trace(response):
+    """Return the request id and log the request once its body has been sent"""
+    trace = g.pop('trace', None)
+    if trace is None:
+        return response
+    response.headers['X-Request-ID'] = trace.request_id
+    if response.is_streamed:
+        response.call_on_close(lambda: end(trace, response.status_code))
+    else:
+        end(trace, response.status_code)
+    return response
 
 @app.route('/')
 def index():
@@ -262,7 +376,7 @@ def index():
         <div class="loading" id="loading">
             <div class="spinner"></div>
             <p>🤖 Analyzing GitHub profile and generating personalized recommendations...</p>
-            <p style="font-size: 0.9em; opacity: 0.7;">This may take 30-60 seconds for AI processing</p>
+            <p style="font-size: 0.9em; opacity: 0.7;">Recommendations will appear here as soon as the AI starts writing them</p>
         </div>
 
         <div class="status" id="status"></div>
@@ -295,7 +409,7 @@ def index():
                 loading.style.display = 'block';
                 
                 try {
-                    const response = await fetch('/analyze', {
+                    const response = await fetch('/analyze/stream', {
                         method: 'POST',
                         headers: {
                             'Content-Type': 'application/json',
@@ -303,25 +417,73 @@ def index():
                         body: JSON.stringify({ username: username })
                     });
                     
-                    const data = await response.json();
-                    loading.style.display = 'none';
+                    if (!response.ok || !response.body) {
+                        throw new Error(`HTTP ${response.status}`);
+                    }
+                    
+                    // Render Server-Sent Events as they arrive
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    let buffer = '';
+                    let profile = null;
+                    let finished = false;
                     
-                    if (data.success) {
-                        status.innerHTML = `✅ <strong>Analysis complete for @${data.profile.username}!</strong><br>
-                                          📊 Found ${data.profile.repos} repositories • 💻 Top languages: ${data.profile.languages.join(', ')}<br>
-                                          Here are your personalized hackathon project recommendations:`;
-                        status.className = 'status success';
+                    const showStatus = (html, kind) => {
+                        status.innerHTML = html;
+                        status.className = `status ${kind}`;
                         status.style.display = 'block';
+                    };
+                    
+                    const handleEvent = (event, data) => {
+                        if (event === 'user') {
+                            showStatus(`🔍 Found @${data.username} with ${data.repos} public repositories...`, 'info');
+                        } else if (event === 'repos') {
+                            showStatus(`📊 Analyzed ${data.count} repositories, generating recommendations...`, 'info');
+                        } else if (event === 'profile') {
+                            profile = data;
+                        } else if (event === 'token') {
+                            if (results.style.display !== 'block') {
+                                loading.style.display = 'none';
+                                results.textContent = '';
+                                results.style.display = 'block';
+                                showStatus(`✅ <strong>Analysis complete for @${profile.username}!</strong><br>
+                                           📊 Found ${profile.repos} repositories • 💻 Top languages: ${profile.languages.join(', ')}<br>
+                                           Here are your personalized hackathon project recommendations:`, 'success');
+                                results.scrollIntoView({ behavior: 'smooth', block: 'start' });
+                            }
+                            results.textContent += data.text;
+                        } else if (event === 'error') {
+                            finished = true;
+                            loading.style.display = 'none';
+                            showStatus(`❌ <strong>Error:</strong> ${data.error}`, 'error');
+                        } else if (event === 'done') {
+                            finished = true;
+                            loading.style.display = 'none';
+                        }
+                    };
+                    
+                    while (true) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffer += decoder.decode(value, { stream: true });
                         
-                        results.textContent = data.recommendations;
-                        results.style.display = 'block';
-                        
-                        // Scroll to results
-                        results.scrollIntoView({ behavior: 'smooth', block: 'start' });
-                    } else {
-                        status.innerHTML = `❌ <strong>Error:</strong> ${data.error}`;
-                        status.className = 'status error';
-                        status.style.display = 'block';
+                        let boundary;
+                        while ((boundary = buffer.indexOf('\\n\\n')) !== -1) {
+                            const frame = buffer.slice(0, boundary);
+                            buffer = buffer.slice(boundary + 2);
+                            
+                            let event = 'message';
+                            let payload = '';
+                            for (const line of frame.split('\\n')) {
+                                if (line.startsWith('event: ')) event = line.slice(7);
+                                else if (line.startsWith('data: ')) payload += line.slice(6);
+                            }
+                            if (payload) handleEvent(event, JSON.parse(payload));
+                        }
+                    }
+                    
+                    if (!finished) {
+                        throw new Error('Connection closed before recommendations finished');
                     }
                 } catch (error) {
                     loading.style.display = 'none';
@@ -344,196 +506,799 @@ def index():
     """
     return html
 
+class AnalysisError(Exception):
+    """Raised when a GitHub profile cannot be analyzed"""
+
+def user_lookup(username):
+    """MCP call for a user's profile"""
+    return "search_users", {
+        "query": f"user:{username}",
+        "per_page": 1
+    }
+
+def start_user_lookup(username):
+    """Start the user lookup in the background"""
+    # The user lookup only needs the username, so it runs while the
+    # repository pages are fetched instead of paying round-trips in series
+    return mcp_executor.submit(traced(call_mcp_tool), *user_lookup(username))
+
+def resolve_user(user_result, username):
+    """Return the GitHub user from a search_users result"""
+    if not user_result["success"]:
+        raise AnalysisError(f"Failed to find user: {user_result.get('error')}")
+    
+    users_data = user_result.get("data", {})
+    if not users_data.get("items"):
+        raise AnalysisError(f"User '{username}' not found on GitHub")
+    
+    user = users_data["items"][0]
+    # Keep only what prompts and payloads use, so profiles held by jobs and
+    # batches stay small
+    user_info = {field: user[field] for field in USER_FIELDS if field in user}
+    print(f"✅ Found user: @{user_info.get('login')} with {user_info.get('public_repos', 0)} repos")
+    return user_info
+
+def resolve_repositories(repos_result):
+    """Return the repositories from a search_repositories result"""
+    if not repos_result["success"]:
+        raise AnalysisError(f"Failed to fetch repositories: {repos_result.get('error')}")
+    
+    repos_data = repos_result.get("data", {})
+    return repos_data.get("items", [])
+
+def ingested(aggregate):
+    """Log an ingestion summary and return the aggregate"""
+    stop = ", stopped early once skills settled" if aggregate.stopped_early else ""
+    print(f"✅ Analyzed {aggregate.repos} repositories over {aggregate.pages} page(s){stop}")
+    return aggregate
+
+def new_aggregate():
+    # Per-repository contributions are only needed to refresh a stored profile
+    return SkillAggregate(skill_matcher.find, PROFILE_HALF_LIFE_DAYS, keep_contributions=profile_store is not None)
+
+def ingest_repositories(username):
+    """Page through a user's repositories, folding them into running skill counts"""
+    pages = repository_pages(traced(call_mcp_tool), username, resolve_repositories, mcp_executor, **INGEST)
+    with stage('repositories'):
+        return ingested(ingest(pages, new_aggregate(), INGEST_STABLE_PAGES))
+
+def ingest_repository_steps(username, aggregate):
+    """ingest_repositories() into aggregate, yielding after each page"""
+    pages = repository_pages(traced(call_mcp_tool), username, resolve_repositories, mcp_executor, **INGEST)
+    return ingest_steps(pages, aggregate, INGEST_STABLE_PAGES)
+
+async def ingest_repositories_async(username):
+    """Async ingest_repositories for the ASGI serving mode"""
+    pages = repository_pages_async(call_mcp_tool_async, username, resolve_repositories, **INGEST)
+    with stage('repositories'):
+        return ingested(await ingest_async(pages, new_aggregate(), INGEST_STABLE_PAGES))
+
+def save_profile(username, user_info, aggregate):
+    """Store a freshly ingested profile for later incremental refreshes"""
+    if profile_store is not None:
+        profile_store.replace(username, user_info, aggregate)
+
+def stored_profile(username):
+    """The user's stored profile, or None if missing or due for a full rebuild"""
+    if profile_store is None:
+        return None
+    stored = profile_store.load(username)
+    if stored is None or time.time() - stored.rebuilt_at > PROFILE_REBUILD_INTERVAL:
+        return None
+    print(f"📊 Checking repositories updated since {stored.watermark or 'the last analysis'}...")
+    return stored
+
+def delta_settings():
+    """Small pages, fetched one at a time: most refreshes stop on the first page"""
+    return {"per_page": PROFILE_DELTA_PER_PAGE, "max_repos": INGEST["max_repos"], "workers": 1}
+
+def refreshed(username, stored, delta):
+    """Apply repositories updated since the stored watermark"""
+    if delta.repos:
+        stored = profile_store.apply(username, delta) or stored
+    print(f"♻️ Refreshed stored profile with {delta.repos} updated repositories ({stored.profile.repos} total)")
+    return stored
+
+def refresh_profile(username, stored):
+    """Bring a stored profile up to date with the repositories updated since its watermark"""
+    pages = repository_pages(traced(call_mcp_tool), username, resolve_repositories, mcp_executor, **delta_settings())
+    with stage('profile_refresh'):
+        return refreshed(username, stored, ingest_since(pages, new_aggregate(), stored.watermark))
+
+async def refresh_profile_async(username, stored):
+    """Async refresh_profile for the ASGI serving mode"""
+    pages = repository_pages_async(call_mcp_tool_async, username, resolve_repositories, **delta_settings())
+    with stage('profile_refresh'):
+        return refreshed(username, stored, await ingest_since_async(pages, new_aggregate(), stored.watermark))
+
+# Recommendation prompt layout (see recommendations.py); "prefix" keeps a
+# byte-identical system prompt so the model runner can reuse its KV cache
+PROMPT_LAYOUT = prompt_layout()
+
+def build_recommendation_messages(user_info, top_languages, top_topics, top_frameworks, trends_context, candidates=()):
+    """Build the recommendation chat messages for a developer profile"""
+    messages, prompt = recommendation_messages(
+        user_info, top_languages, top_topics, top_frameworks, trends_context, candidates,
+        layout=PROMPT_LAYOUT
+    )
+    if prompt.truncated:
+        print(f"✂️ Trimmed {', '.join(prompt.truncated)} (prompt is {prompt.tokens} tokens)")
+    return messages
+
+def profile_payload(user_info, top_languages, top_topics, top_frameworks):
+    """Profile summary returned alongside the recommendations"""
+    return {
+        "username": user_info.get('login'),
+        "repos": user_info.get('public_repos', 0),
+        "languages": top_languages,
+        "topics": top_topics[:5],
+        "frameworks": top_frameworks[:5]
+    }
+
+def recommendation_request(messages, max_tokens=RECOMMENDATION_MAX_TOKENS):
+    """Chat completion arguments for recommendation messages"""
+    arguments = {
+        "model": os.getenv('MODEL_NAME', 'ai/qwen3:8B-Q4_0'),
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": 0.7
+    }
+    # Lets model runner logs be matched to the request that caused them
+    if request_id():
+        arguments["extra_headers"] = {"X-Request-ID": request_id()}
+    return arguments
+
+def completion_tokens(response):
+    """Generated token count reported by a non-streamed completion, if any"""
+    return getattr(getattr(response, 'usage', None), 'completion_tokens', None)
+
+def request_recommendations(messages, max_tokens=RECOMMENDATION_MAX_TOKENS, stream=False):
+    """Send the recommendation messages to the model"""
+    client = create_ai_client()
+    return client.chat.completions.create(**recommendation_request(messages, max_tokens), stream=stream)
+
+def analysis_payload(user_info, skills, recommendations, cached, retrieved=False):
+    """Build the /analyze response payload"""
+    annotate(cached=cached, retrieved=retrieved)
+    return {
+        "success": True,
+        "recommendations": recommendations,
+        "cached": cached,
+        "retrieved": retrieved,
+        "profile": profile_payload(user_info, *skills)
+    }
+
+def idea_candidates(skills):
+    """Closest ideas in the local index for a profile"""
+    with stage('retrieval'):
+        return [idea for _, idea in idea_index.search(profile_query(*skills), IDEA_CANDIDATES)]
+
+def can_serve_ideas(candidates, priority):
+    """Whether an interactive request may be answered from retrieved ideas"""
+    return IDEAS_FALLBACK and bool(candidates) and priority <= PRIORITY_INTERACTIVE
+
+def retrieved_recommendations(skills, candidates):
+    """Recommendations rendered straight from the top retrieved ideas"""
+    print("📚 Model is saturated, serving retrieved ideas")
+    return render_ideas(candidates[:3], *skills)
+
+def learn_ideas(recommendations, candidates=()):
+    """Feed a generation's projects back into the idea index"""
+    learned = idea_index.learn(parse_recommendations(recommendations, candidates))
+    if learned:
+        print(f"📚 Added {learned} new ideas to the index")
+
+def fetch_profile(username):
+    """Look up a GitHub user and extract their skills"""
+    stored = stored_profile(username)
+    if stored is not None:
+        stored = refresh_profile(username, stored)
+        return stored.user_info, stored.profile.top()
+    
+    print(f"🔍 Searching for GitHub user: {username}")
+    user_future = start_user_lookup(username)
+    
+    print(f"📊 Fetching repositories for {username}...")
+    try:
+        aggregate = ingest_repositories(username)
+    except Exception:
+        # A missing user explains a failed repository search, so report it first
+        resolve_user(user_future.result(), username)
+        raise
+    user_info = resolve_user(user_future.result(), username)
+    
+    save_profile(username, user_info, aggregate)
+    # Extract skills and technologies
+    return user_info, aggregate.top()
+
+def generate_recommendations(user_info, skills, trends_context, priority, candidates=()):
+    """Ask the model for recommendations, waiting for an admission slot"""
+    print("🤖 Generating personalized recommendations...")
+    messages = build_recommendation_messages(user_info, *skills, trends_context, candidates)
+    
+    queued = time.perf_counter()
+    with admission.slot(priority):
+        record_stage('model_queue', time.perf_counter() - queued)
+        generation = Generation('complete')
+        try:
+            response = request_recommendations(messages, reply_tokens(candidates))
+            recommendations = response.choices[0].message.content.strip()
+        except Exception as e:
+            generation.finish(outcome='error')
+            print(f"❌ AI generation error: {str(e)}")
+            raise AnalysisError(f"AI recommendation generation failed: {str(e)}")
+        generation.finish(completion_tokens(response))
+        print("✅ Recommendations generated successfully")
+        return recommendations
+
+def recommend(user_info, skills, priority=PRIORITY_INTERACTIVE):
+    """Return the /analyze payload for an extracted profile"""
+    # Latest hackathon trends from the background refresher
+    trends_context = trends.snapshot().summary
+    
+    # Developers with the same skill profile get the same recommendations
+    features = profile_features(*skills)
+    recommendations = recommendation_cache.get(features, trends_context)
+    cached = recommendations is not None
+    
+    if cached:
+        print("♻️ Reusing cached recommendations for a matching profile")
+        return analysis_payload(user_info, skills, recommendations, cached)
+    
+    candidates = idea_candidates(skills)
+    fallback = can_serve_ideas(candidates, priority)
+    if fallback and admission.saturated(IDEAS_FALLBACK_QUEUE):
+        return analysis_payload(user_info, skills, retrieved_recommendations(skills, candidates), False, True)
+    
+    try:
+        # Matching profiles in flight at the same time share one generation
+        recommendations = recommendation_flight.do(
+            profile_fingerprint(features, trends_context),
+            generate_recommendations, user_info, skills, trends_context, priority, candidates
+        )
+    except QueueFull:
+        if not fallback:
+            raise
+        return analysis_payload(user_info, skills, retrieved_recommendations(skills, candidates), False, True)
+    
+    recommendation_cache.set(features, trends_context, recommendations)
+    learn_ideas(recommendations, candidates)
+    return analysis_payload(user_info, skills, recommendations, cached)
+
+def run_analysis(username, priority=PRIORITY_INTERACTIVE):
+    """Analyze a GitHub profile and return the /analyze response payload"""
+    annotate(username=username)
+    user_info, skills = fetch_profile(username)
+    return recommend(user_info, skills, priority)
+
+async def run_analysis_async(username, priority=PRIORITY_INTERACTIVE):
+    """Async-native run_analysis: MCP and model calls are awaited, not blocking a thread"""
+    annotate(username=username)
+    stored = stored_profile(username)
+    if stored is not None:
+        stored = await refresh_profile_async(username, stored)
+        user_info, skills = stored.user_info, stored.profile.top()
+    else:
+        print(f"🔍 Searching for GitHub user: {username}")
+        user_result, aggregate = await asyncio.gather(
+            call_mcp_tool_async(*user_lookup(username)),
+            ingest_repositories_async(username)
+        )
+        user_info = resolve_user(user_result, username)
+        save_profile(username, user_info, aggregate)
+        skills = aggregate.top()
+    
+    trends_context = trends.snapshot().summary
+    
+    features = profile_features(*skills)
+    recommendations = recommendation_cache.get(features, trends_context)
+    cached = recommendations is not None
+    
+    if cached:
+        print("♻️ Reusing cached recommendations for a matching profile")
+        return analysis_payload(user_info, skills, recommendations, cached)
+    
+    candidates = idea_candidates(skills)
+    fallback = can_serve_ideas(candidates, priority)
+    if fallback and admission.saturated(IDEAS_FALLBACK_QUEUE):
+        return analysis_payload(user_info, skills, retrieved_recommendations(skills, candidates), False, True)
+    
+    print("🤖 Generating personalized recommendations...")
+    messages = build_recommendation_messages(user_info, *skills, trends_context, candidates)
+    
+    queued = time.perf_counter()
+    try:
+        async with admission.slot_async(priority):
+            record_stage('model_queue', time.perf_counter() - queued)
+            generation = Generation('complete')
+            try:
+                client = create_async_ai_client()
+                response = await client.chat.completions.create(
+                    **recommendation_request(messages, reply_tokens(candidates))
+                )
+                recommendations = response.choices[0].message.content.strip()
+            except Exception as e:
+                generation.finish(outcome='error')
+                print(f"❌ AI generation error: {str(e)}")
+                raise AnalysisError(f"AI recommendation generation failed: {str(e)}")
+            generation.finish(completion_tokens(response))
+            print("✅ Recommendations generated successfully")
+    except QueueFull:
+        if not fallback:
+            raise
+        return analysis_payload(user_info, skills, retrieved_recommendations(skills, candidates), False, True)
+    
+    recommendation_cache.set(features, trends_context, recommendations)
+    learn_ideas(recommendations, candidates)
+    return analysis_payload(user_info, skills, recommendations, cached)
+
+def parse_priority(value):
+    """Parse an X-Priority header value (lower is served first)"""
+    try:
+        return max(int(value), PRIORITY_INTERACTIVE)
+    except (TypeError, ValueError):
+        return PRIORITY_INTERACTIVE
+
+def queue_full_response(error):
+    """429 response telling the client when to retry"""
+    response = jsonify({"success": False, "error": str(error), "retry_after": error.retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def request_username():
+    """Read the username from a JSON body or query string"""
+    data = request.get_json(silent=True) or {}
+    return (data.get('username') or request.args.get('username', '')).strip()
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     """Analyze GitHub profile and generate recommendations"""
     try:
-        data = request.get_json()
-        username = data.get('username', '').strip()
+        username = request_username()
         
         if not username:
             return jsonify({"success": False, "error": "Username is required"})
         
-        # Search for user
-        print(f"🔍 Searching for GitHub user: {username}")
-        user_result = call_mcp_tool("search_users", {
-            "query": f"user:{username}",
-            "per_page": 1
-        })
-        
-        if not user_result["success"]:
-            return jsonify({"success": False, "error": f"Failed to find user: {user_result.get('error')}"})
-        
-        users_data = user_result.get("data", {})
-        if not users_data.get("items"):
-            return jsonify({"success": False, "error": f"User '{username}' not found on GitHub"})
-        
-        user_info = users_data["items"][0]
-        print(f"✅ Found user: @{user_info.get('login')} with {user_info.get('public_repos', 0)} repos")
+        # Requests for the same user attach to the analysis already running
+        priority = parse_priority(request.headers.get('X-Priority'))
+        return jsonify(analysis_flight.do(username.lower(), run_analysis, username, priority))
         
-        # Search for repositories
-        print(f"📊 Fetching repositories for {username}...")
-        repos_result = call_mcp_tool("search_repositories", {
-            "query": f"user:{username}",
-            "sort": "updated",
-            "per_page": 20
-        })
-        
-        if not repos_result["success"]:
-            return jsonify({"success": False, "error": f"Failed to fetch repositories: {repos_result.get('error')}"})
-        
-        repos_data = repos_result.get("data", {})
-        repositories = repos_data.get("items", [])
-        print(f"✅ Analyzed {len(repositories)} repositories")
-        
-        # Extract skills and technologies
-        languages = {}
-        topics = set()
-        frameworks = set()
+    except QueueFull as e:
+        print(f"⏳ Model queue full, rejecting request for {username}")
+        return queue_full_response(e)
+    except AnalysisError as e:
+        annotate(error=str(e))
+        return jsonify({"success": False, "error": str(e)})
+    except Exception as e:
+        print(f"❌ Analysis error: {str(e)}")
+        annotate(error=str(e))
+        return jsonify({"success": False, "error": f"Analysis failed: {str(e)}"})
+
+def sse_event(event, data):
+    """Format a Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def user_event(user_info):
+    """SSE event announcing the GitHub user being analyzed"""
+    return sse_event("user", {
+        "username": user_info.get('login'),
+        "repos": user_info.get('public_repos', 0)
+    })
+
+def retrieved_events(skills, candidates):
+    """SSE events answering from retrieved ideas instead of the model"""
+    annotate(cached=False, retrieved=True)
+    yield sse_event("token", {"text": retrieved_recommendations(skills, candidates)})
+    yield sse_event("done", {"success": True, "cached": False, "retrieved": True})
+
+def stream_analysis(username, priority=PRIORITY_INTERACTIVE):
+    """Yield progress events and then recommendation tokens as SSE"""
+    annotate(username=username)
+    try:
+        stored = stored_profile(username)
+        if stored is not None:
+            user_info = stored.user_info
+            yield user_event(user_info)
+            profile = refresh_profile(username, stored).profile
+        else:
+            print(f"🔍 Searching for GitHub user: {username}")
+            user_future = start_user_lookup(username)
+            
+            # Repository pages load while the user lookup is in flight; the
+            # user event goes out as soon as the lookup lands
+            print(f"📊 Fetching repositories for {username}...")
+            aggregate = new_aggregate()
+            user_info = None
+            try:
+                with stage('repositories'):
+                    for _ in ingest_repository_steps(username, aggregate):
+                        if user_info is None and user_future.done():
+                            user_info = resolve_user(user_future.result(), username)
+                            yield user_event(user_info)
+            except Exception:
+                # A missing user explains a failed repository search, so report it first
+                if user_info is None:
+                    resolve_user(user_future.result(), username)
+                raise
+            ingested(aggregate)
+            if user_info is None:
+                user_info = resolve_user(user_future.result(), username)
+                yield user_event(user_info)
+            save_profile(username, user_info, aggregate)
+            profile = aggregate.profile
+        yield sse_event("repos", {"count": profile.repos})
         
-        # Technology keywords to detect
-        tech_keywords = {
-            'react', 'vue', 'angular', 'node', 'express', 'django', 'flask', 
-            'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'tensorflow', 'pytorch',
-            'machine-learning', 'ai', 'blockchain', 'web3', 'api', 'microservices',
-            'database', 'sql', 'nosql', 'mongodb', 'postgres', 'redis', 'firebase'
-        }
+        skills = profile.top()
+        yield sse_event("profile", profile_payload(user_info, *skills))
         
-        for repo in repositories:
-            # Count programming languages
-            if repo.get('language'):
-                lang = repo['language']
-                languages[lang] = languages.get(lang, 0) + 1
-            
-            # Extract repository topics
-            if repo.get('topics'):
-                topics.update(repo['topics'])
-            
-            # Look for frameworks in repo name and description
-            repo_text = f"{repo.get('name', '')} {repo.get('description', '')}".lower()
-            for tech in tech_keywords:
-                if tech in repo_text:
-                    frameworks.add(tech)
+        trends_context = trends.snapshot().summary
+        features = profile_features(*skills)
+        recommendations = recommendation_cache.get(features, trends_context)
+        if recommendations is not None:
+            print("♻️ Reusing cached recommendations for a matching profile")
+            annotate(cached=True, retrieved=False)
+            yield sse_event("token", {"text": recommendations})
+            yield sse_event("done", {"success": True, "cached": True})
+            return
         
-        # Get trending hackathon topics
-        print("🔍 Researching current hackathon trends...")
-        trends_result = call_mcp_tool("search", {
-            "query": "AI hackathon 2025 trending projects",
-            "max_results": 3
-        })
+        candidates = idea_candidates(skills)
+        fallback = can_serve_ideas(candidates, priority)
+        if fallback and admission.saturated(IDEAS_FALLBACK_QUEUE):
+            yield from retrieved_events(skills, candidates)
+            return
         
-        trends_context = ""
-        if trends_result.get("success") and trends_result.get("data"):
-            trends_context = "Current hackathon trends: AI agents, developer tools, climate tech, web3, and accessibility solutions."
+        print("🤖 Streaming personalized recommendations...")
+        messages = build_recommendation_messages(user_info, *skills, trends_context, candidates)
+        parts = []
+        queued = time.perf_counter()
+        try:
+            with admission.slot(priority):
+                record_stage('model_queue', time.perf_counter() - queued)
+                generation = Generation('stream')
+                try:
+                    for chunk in request_recommendations(messages, reply_tokens(candidates), stream=True):
+                        text = chunk.choices[0].delta.content if chunk.choices else None
+                        if text:
+                            generation.token()
+                            parts.append(text)
+                            yield sse_event("token", {"text": text})
+                except Exception as e:
+                    generation.finish(outcome='error')
+                    print(f"❌ AI generation error: {str(e)}")
+                    raise AnalysisError(f"AI recommendation generation failed: {str(e)}")
+                # Streamed chunks carry one token each from llama.cpp and OpenAI
+                generation.finish(len(parts))
+        except QueueFull:
+            if not fallback:
+                raise
+            yield from retrieved_events(skills, candidates)
+            return
         
-        # Generate AI recommendations
-        print("🤖 Generating personalized recommendations...")
-        client = create_ai_client()
-        model_name = os.getenv('MODEL_NAME', 'ai/qwen3:8B-Q4_0')
-        top_languages = list(languages.keys())[:5]
-        top_topics = list(topics)[:10]
-        top_frameworks = list(frameworks)[:8]
+        recommendations = "".join(parts).strip()
+        recommendation_cache.set(features, trends_context, recommendations)
+        learn_ideas(recommendations, candidates)
+        annotate(cached=False, retrieved=False)
+        print("✅ Recommendations streamed successfully")
+        yield sse_event("done", {"success": True, "cached": False})
         
-        prompt = f"""You are an expert hackathon mentor. Based on this GitHub profile analysis, recommend 3 specific hackathon projects that would be perfect for this developer.
+    except QueueFull as e:
+        annotate(error=str(e))
+        yield sse_event("error", {"error": str(e), "retry_after": e.retry_after})
+    except AnalysisError as e:
+        annotate(error=str(e))
+        yield sse_event("error", {"error": str(e)})
+    except Exception as e:
+        print(f"❌ Analysis error: {str(e)}")
+        annotate(error=str(e))
+        yield sse_event("error", {"error": f"Analysis failed: {str(e)}"})
 
-## Developer Profile Analysis:
-**Username**: @{user_info.get('login')}
-**Public Repositories**: {user_info.get('public_repos', 0)}
-**Primary Languages**: {', '.join(top_languages) if top_languages else 'Various'}
-**Repository Topics**: {', '.join(top_topics) if top_topics else 'General development'}
-**Technologies Used**: {', '.join(top_frameworks) if top_frameworks else 'Various frameworks'}
-**Profile Bio**: {user_info.get('bio', 'Not provided')}
+@app.route('/analyze/stream', methods=['GET', 'POST'])
+def analyze_stream():
+    """Stream analysis progress and recommendations as Server-Sent Events"""
+    username = request_username()
+    if not username:
+        return jsonify({"success": False, "error": "Username is required"}), 400
+    
+    return Response(
+        stream_with_context(stream_analysis(username, parse_priority(request.headers.get('X-Priority')))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
-## Context:
-{trends_context}
+def retry_when_queue_full(fn, *args):
+    """Call fn, sleeping out Retry-After hints while the model queue is full"""
+    while True:
+        try:
+            return fn(*args)
+        except QueueFull as e:
+            print(f"⏳ Model queue full, retrying in {e.retry_after}s")
+            time.sleep(e.retry_after)
 
-## Instructions:
-Recommend 3 hackathon projects that:
-1. Match the developer's demonstrated skills and interests
-2. Can realistically be built in 24-48 hours
-3. Address real problems or leverage current tech trends
-4. Showcase the developer's strengths while being achievable
-5. Have clear potential for impact and innovation
+def run_job(payload, priority):
+    """Job handler: run an analysis, waiting out a full model queue"""
+    username = payload["username"]
+    return retry_when_queue_full(analysis_flight.do, username.lower(), run_analysis, username, priority)
 
-Format each recommendation exactly like this:
+# Queued analyses for clients that poll instead of holding a connection open
+# (created by start_services())
+jobs = None
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+services_lock = threading.Lock()
 
-**🚀 Project 1: [Creative, memorable project name]**
+def start_services(background=True):
+    """Open the stores and, with background, start trend refreshes and job workers
 
-**Category**: [e.g., AI Agents, Developer Tools, Web3, Climate Tech, Accessibility, etc.]
+    Nothing is started at import, so a process that only loads this module
+    (such as a uvicorn supervisor) runs no second copy of them.
+    """
+    global profile_store, jobs
+    with services_lock:
+        if jobs is None:
+            profile_store = create_profile_store()
+            jobs = JobManager(create_job_store(), run_job, workers=JOB_WORKERS)
+        if background:
+            trends.start()
+            jobs.start()
 
-**Description**: [2-3 compelling sentences describing what the project does, why it's valuable, and what problem it solves]
+def stop_services():
+    """Stop trend refreshes and job workers"""
+    trends.stop()
+    if jobs is not None:
+        jobs.stop()
 
-**Tech Stack**: [Specific technologies, prioritizing languages/frameworks the developer knows]
+# Upper bound for a single long-poll request
+JOB_MAX_WAIT = float(os.getenv('JOB_MAX_WAIT', '30'))
 
-**Key Features**:
-• [Main feature 1]
-• [Main feature 2] 
-• [Main feature 3]
-• [Bonus feature if time permits]
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue an analysis and return its job id immediately"""
+    username = request_username()
+    if not username:
+        return jsonify({"success": False, "error": "Username is required"}), 400
+    
+    job_id = jobs.submit({"username": username}, parse_priority(request.headers.get('X-Priority')))
+    print(f"📥 Queued analysis job {job_id} for {username}")
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}"
+    }), 202
 
-**Difficulty**: [Beginner/Intermediate/Advanced - based on their experience level]
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Return a job; ?wait=N long-polls up to N seconds for it to finish"""
+    try:
+        wait = min(float(request.args.get('wait', 0)), JOB_MAX_WAIT)
+    except ValueError:
+        wait = 0
+    
+    job = jobs.store.wait(job_id, wait) if wait > 0 else jobs.store.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found or expired"}), 404
+    return jsonify(public_job(job))
 
-**Why Perfect for You**: [2-3 sentences explaining how this matches their GitHub activity, skills, and interests]
+# Batch analysis: lookups fan out wide while model requests match the admission limit
+BATCH_LOOKUP_WORKERS = int(os.getenv('BATCH_LOOKUP_WORKERS', '8'))
+BATCH_MAX_USERS = int(os.getenv('BATCH_MAX_USERS', '500'))
 
-**Potential Impact**: [Who would benefit and how this could make a difference]
+def recommend_for_batch(profile):
+    """Batch model stage: low-priority recommendation for a fetched profile"""
+    user_info, skills = profile
+    return retry_when_queue_full(recommend, user_info, skills, PRIORITY_BATCH)
 
----
+def analyze_many(usernames):
+    """Yield one result record per username as each analysis finishes"""
+    return run_pipeline(
+        usernames,
+        fetch_profile,
+        recommend_for_batch,
+        lookup_workers=BATCH_LOOKUP_WORKERS,
+        model_workers=admission.max_in_flight
+    )
 
-**🚀 Project 2: [Different creative name]**
-[Same format...]
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze many usernames, streaming a JSON line per user as each finishes"""
+    data = request.get_json(silent=True) or {}
+    usernames = data.get('usernames')
+    if not isinstance(usernames, list):
+        return jsonify({"success": False, "error": "usernames must be a list"}), 400
+    
+    usernames = dedupe_usernames([str(u) for u in usernames])
+    if not usernames:
+        return jsonify({"success": False, "error": "At least one username is required"}), 400
+    if len(usernames) > BATCH_MAX_USERS:
+        return jsonify({"success": False, "error": f"At most {BATCH_MAX_USERS} usernames per batch"}), 413
+    
+    print(f"📋 Batch analysis of {len(usernames)} users")
+    
+    def generate():
+        for record in analyze_many(usernames):
+            yield json.dumps(record) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
----
+REGISTRY.callback('hackathon_model_in_flight', 'gauge', 'Completions running on the model runner',
+                  lambda: [({}, admission.stats()["in_flight"])])
+REGISTRY.callback('hackathon_model_queue_depth', 'gauge', 'Requests waiting for a model slot',
+                  lambda: [({}, admission.stats()["queue_depth"])])
 
-**🚀 Project 3: [Different creative name]**
-[Same format...]
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus metrics for this process"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
----
+@app.route('/health')
+def health():
+    """Health check endpoint"""
+    return {
+        "status": "healthy",
+        "service": "hackathon-recommender",
+        "mcp_cache": mcp_cache.stats(),
+        "recommendation_cache": recommendation_cache.stats(),
+        "ideas": idea_index.stats(),
+        "admission": admission.stats(),
+        "jobs": jobs.stats(),
+        "coalescing": {
+            "analyze": analysis_flight.stats(),
+            "mcp": mcp_flight.stats(),
+            "analyze_async": analysis_flight_async.stats(),
+            "mcp_async": mcp_flight_async.stats()
+        }
+    }
 
-**💡 Pro Tips for Success**:
-• Start with the core functionality first
-• Focus on user experience and clear value proposition
-• Prepare a compelling demo that shows real-world usage
-• Consider open-sourcing for community impact
+async def read_json_body(receive):
+    """Read an ASGI request body as JSON"""
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    try:
+        data = json.loads(body) if body else {}
+    except ValueError:
+        data = {}
+    return data if isinstance(data, dict) else {}
 
-Keep recommendations innovative, practical, and directly relevant to their programming background. Each project should feel exciting and achievable while demonstrating technical skill."""
+async def send_json(send, payload, status=200, headers=()):
+    """Send a JSON response over ASGI"""
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
 
-        try:
-            response = client.chat.completions.create(
-                model=model_name,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1800,
-                temperature=0.7
-            )
-            recommendations = response.choices[0].message.content.strip()
-            print("✅ Recommendations generated successfully")
-            
-            return jsonify({
-                "success": True,
-                "recommendations": recommendations,
-                "profile": {
-                    "username": user_info.get('login'),
-                    "repos": user_info.get('public_repos', 0),
-                    "languages": top_languages,
-                    "topics": top_topics[:5],
-                    "frameworks": top_frameworks[:5]
-                }
-            })
-            
-        except Exception as e:
-            print(f"❌ AI generation error: {str(e)}")
-            return jsonify({"success": False, "error": f"AI recommendation generation failed: {str(e)}"})
+async def analyze_asgi(scope, receive, send):
+    """Async-native /analyze handler"""
+    request_headers = dict(scope["headers"])
+    trace = begin('/analyze', request_headers.get(b"x-request-id", b"").decode('latin-1'))
+    status, headers = 200, []
+    try:
+        data = await read_json_body(receive)
+        username = str(data.get('username') or '').strip()
+        priority = parse_priority(request_headers.get(b"x-priority"))
         
+        if not username:
+            payload = {"success": False, "error": "Username is required"}
+        else:
+            payload = await analysis_flight_async.do(
+                username.lower(), run_analysis_async, username, priority
+            )
+    
+    except QueueFull as e:
+        status, headers = 429, [(b"retry-after", str(e.retry_after).encode())]
+        payload = {"success": False, "error": str(e), "retry_after": e.retry_after}
+    except AnalysisError as e:
+        payload = {"success": False, "error": str(e)}
     except Exception as e:
         print(f"❌ Analysis error: {str(e)}")
-        return jsonify({"success": False, "error": f"Analysis failed: {str(e)}"})
+        payload = {"success": False, "error": f"Analysis failed: {str(e)}"}
+    
+    if not payload["success"]:
+        annotate(error=payload["error"])
+    headers.append((b"x-request-id", trace.request_id.encode()))
+    await send_json(send, payload, status, headers)
+    end(trace, status)
 
-@app.route('/health')
-def health():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "hackathon-recommender"}
+# Flask routes run on a thread pool, not one shared thread, and their
+# responses are closed when sent so streamed responses clean up
+flask_asgi = WSGIMiddleware(app, workers=int(os.getenv('ASGI_SYNC_THREADS', '32')))
+
+async def asgi_app(scope, receive, send):
+    """ASGI entry point: async-native /analyze, every other route served by Flask"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                start_services()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                stop_services()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    
+    if scope["type"] == "http" and scope["path"] == "/analyze" and scope["method"] == "POST":
+        await analyze_asgi(scope, receive, send)
+    else:
+        await flask_asgi(scope, receive, send)
+
+def batch_main(argv):
+    """CLI: analyze a file of usernames and append JSONL results"""
+    parser = argparse.ArgumentParser(
+        prog='hackathon-recommender.py batch',
+        description='Generate recommendations for many GitHub usernames'
+    )
+    parser.add_argument('input', help='text or JSONL file of usernames ("-" for stdin)')
+    parser.add_argument('-o', '--output', default='-', help='JSONL file to append results to (default: stdout)')
+    parser.add_argument('--checkpoint', help='file of finished usernames to skip on resume (default: OUTPUT.checkpoint)')
+    args = parser.parse_args(argv)
+    start_services(background=False)
+    
+    checkpoint_path = args.checkpoint or (f"{args.output}.checkpoint" if args.output != '-' else None)
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+    
+    usernames = dedupe_usernames(read_usernames(args.input))
+    pending = [u for u in usernames if checkpoint is None or u not in checkpoint]
+    
+    results = sys.stdout if args.output == '-' else open(args.output, 'a')
+    succeeded = 0
+    
+    try:
+        # Progress logs go to stderr so stdout stays valid JSONL
+        with contextlib.redirect_stdout(sys.stderr):
+            print(f"📋 {len(usernames)} unique usernames, {len(usernames) - len(pending)} already done")
+            if not trends.snapshot().updated_at:
+                trends.refresh()
+            
+            for record in analyze_many(pending):
+                results.write(json.dumps(record) + "\n")
+                results.flush()
+                if record.get("success"):
+                    succeeded += 1
+                    if checkpoint is not None:
+                        checkpoint.record(record["username"])
+            
+            print(f"✅ Batch finished: {succeeded}/{len(pending)} succeeded")
+    finally:
+        if results is not sys.stdout:
+            results.close()
+        if checkpoint is not None:
+            checkpoint.close()
+    return 0 if succeeded == len(pending) else 1
 
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['batch']:
+        sys.exit(batch_main(sys.argv[2:]))
+    
     print("🚀 Starting AI Agents Hackathon Project Recommender")
     print("🌐 Server will be available at: http://localhost:8501")
     print("🔧 MCP Gateway: " + os.getenv('MCPGATEWAY_ENDPOINT', 'http://mcp-gateway:8811'))
-    app.run(host='0.0.0.0', port=8501, debug=False)
+    
+    if os.getenv('SERVER_MODE', 'flask') == 'asgi':
+        workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+        print(f"⚡ Async ASGI mode with {workers} worker(s)")
+        if workers == 1:
+            # Serve this module's app; asgi.py would load a second copy of it
+            import uvicorn
+            uvicorn.run(asgi_app, host='0.0.0.0', port=8501)
+        else:
+            # Hand the process to the uvicorn CLI so the supervisor never
+            # loads the service and each worker loads it once
+            sys.stdout.flush()
+            os.execv(sys.executable, [
+                sys.executable, '-m', 'uvicorn', 'asgi:app',
+                '--host', '0.0.0.0', '--port', '8501', '--workers', str(workers),
+                '--app-dir', os.path.dirname(os.path.abspath(__file__))
+            ])
+    else:
+        start_services()
+        app.run(host='0.0.0.0', port=8501, debug=False)
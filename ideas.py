@@ -0,0 +1,281 @@
+"""
+Local project-idea index.
+Curated ideas (ideas.jsonl) and ideas parsed from past generations are indexed
+with TF-IDF on NumPy, so the closest ideas for a profile are found on the CPU in
+well under a millisecond. The model then only picks and personalizes a short
+list, and when it is saturated the retrieved ideas can be served directly.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import Counter, namedtuple
+
+import numpy as np
+
+DEFAULT_IDEAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ideas.jsonl')
+
+TOKEN = re.compile(r'[a-z0-9+#]+')
+
+# How much each profile section counts in a query
+LANGUAGE_WEIGHT = 1.5
+FRAMEWORK_WEIGHT = 1.0
+TOPIC_WEIGHT = 0.75
+
+# Tech and tags describe what an idea needs, so they count double
+IDEA_FIELDS = (('name', 1), ('category', 1), ('description', 1), ('tech', 2), ('tags', 2))
+
+PROJECT_HEADING = re.compile(r'^\*\*🚀 Project \d+:\s*(.+?)\*\*\s*$', re.MULTILINE)
+LABELLED_LINE = re.compile(r'^\*\*(Category|Description|Tech Stack|Difficulty|Based On)\*\*:\s*(.+?)\s*$', re.MULTILINE)
+NUMBER = re.compile(r'\d+')
+BULLET = re.compile(r'^\s*[•\-*]\s+(.+?)\s*$', re.MULTILINE)
+
+IndexSnapshot = namedtuple('IndexSnapshot', ['ideas', 'vocabulary', 'idf', 'matrix'])
+
+EMPTY_INDEX = IndexSnapshot((), {}, np.zeros(0, dtype=np.float32), np.zeros((0, 0), dtype=np.float32))
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+def idea_key(idea):
+    """Ideas with the same normalized name are duplicates"""
+    return ' '.join(tokenize(idea.get('name', '')))
+
+
+def idea_terms(idea):
+    """Weighted term counts of an idea"""
+    terms = Counter()
+    for field, weight in IDEA_FIELDS:
+        value = idea.get(field) or ''
+        text = ' '.join(value) if isinstance(value, list) else str(value)
+        for token in tokenize(text):
+            terms[token] += weight
+    return terms
+
+
+def profile_query(languages, topics, frameworks):
+    """Weighted query terms for a developer profile"""
+    terms = Counter()
+    for values, weight in ((languages, LANGUAGE_WEIGHT), (frameworks, FRAMEWORK_WEIGHT), (topics, TOPIC_WEIGHT)):
+        for value in values:
+            for token in tokenize(value):
+                terms[token] += weight
+    return terms
+
+
+def build_index(ideas):
+    """TF-IDF matrix with L2-normalized rows, one row per idea"""
+    if not ideas:
+        return EMPTY_INDEX
+    documents = [idea_terms(idea) for idea in ideas]
+    vocabulary = {}
+    for terms in documents:
+        for token in terms:
+            vocabulary.setdefault(token, len(vocabulary))
+
+    counts = np.zeros((len(ideas), len(vocabulary)), dtype=np.float32)
+    for row, terms in enumerate(documents):
+        for token, count in terms.items():
+            counts[row, vocabulary[token]] = count
+
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = (np.log((1 + len(ideas)) / (1 + document_frequency)) + 1).astype(np.float32)
+    matrix = np.log1p(counts) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms > 0, norms, 1)
+    return IndexSnapshot(tuple(ideas), vocabulary, idf, matrix)
+
+
+def load_ideas(path):
+    """Read ideas from a JSONL file (missing file means no ideas)"""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def split_list(value):
+    return [item.strip() for item in re.split(r',|\band\b', value) if item.strip()]
+
+
+def based_on(fields, candidates):
+    """The candidate idea a recommendation says it adapts, if any"""
+    number = NUMBER.search(fields.get('Based On', ''))
+    if number and 1 <= int(number.group()) <= len(candidates):
+        return candidates[int(number.group()) - 1]
+    return {}
+
+
+def parse_recommendations(text, candidates=()):
+    """Extract ideas from model output in the recommendation format
+
+    Adapted candidates leave out category and difficulty, so those come from
+    the candidate their "Based On" line names.
+    """
+    headings = list(PROJECT_HEADING.finditer(text))
+    ideas = []
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        # Anything after the last project's separator (e.g. pro tips) is not part of it
+        block = text[heading.end():end].split('\n---', 1)[0]
+        fields = {label: value for label, value in LABELLED_LINE.findall(block)}
+        if not fields.get('Description'):
+            continue
+        features = block.split('**Key Features**', 1)[1] if '**Key Features**' in block else ''
+        source = based_on(fields, candidates)
+        ideas.append({
+            "name": heading.group(1).strip('[] '),
+            "category": fields.get('Category') or source.get('category', ''),
+            "description": fields['Description'],
+            "tech": split_list(fields.get('Tech Stack', '')),
+            "features": BULLET.findall(features.split('**Difficulty**', 1)[0])[:4],
+            "difficulty": fields.get('Difficulty', '').split(' ')[0] or source.get('difficulty', ''),
+            "tags": [],
+            "learned": True
+        })
+    return ideas
+
+
+class IdeaIndex:
+    """Searchable set of curated and learned project ideas"""
+
+    def __init__(self, ideas=(), learned_path=None, max_learned=500):
+        self.learned_path = learned_path
+        self.max_learned = max_learned
+        self._curated = list(ideas)
+        learned = load_ideas(learned_path)
+        self._learned = learned[-max_learned:]
+        self._keys = {idea_key(idea) for idea in self._curated + self._learned}
+        self._lock = threading.Lock()
+        self._snapshot = build_index(self._curated + self._learned)
+        self._stale = False
+        self._searches_lock = threading.Lock()
+        self.searches = 0
+        # Lines in the learned file; it is rewritten with only the kept ideas
+        # once it holds twice as many as are kept
+        self._file_lines = len(learned)
+        if len(learned) > max_learned:
+            self._compact()
+
+    def __len__(self):
+        return len(self._snapshot.ideas)
+
+    def snapshot(self):
+        """Current index, rebuilt first if ideas were learned since the last build"""
+        if self._stale:
+            with self._lock:
+                if self._stale:
+                    self._snapshot = build_index(self._curated + self._learned)
+                    self._stale = False
+        return self._snapshot
+
+    def search(self, query, k=5):
+        """Return up to k (score, idea) pairs for weighted query terms, best first"""
+        index = self.snapshot()
+        with self._searches_lock:
+            self.searches += 1
+        vector = np.zeros(len(index.vocabulary), dtype=np.float32)
+        for token, weight in query.items():
+            column = index.vocabulary.get(token)
+            if column is not None:
+                vector[column] += weight * index.idf[column]
+        if not vector.any():
+            return []
+        scores = index.matrix @ (vector / np.linalg.norm(vector))
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(float(scores[i]), index.ideas[i]) for i in best if scores[i] > 0]
+
+    def learn(self, ideas):
+        """Add new ideas (e.g. from a generation); return how many were new"""
+        added = []
+        with self._lock:
+            for idea in ideas:
+                key = idea_key(idea)
+                if key and key not in self._keys:
+                    self._keys.add(key)
+                    added.append(idea)
+            if not added:
+                return 0
+            self._learned.extend(added)
+            if len(self._learned) > self.max_learned:
+                for idea in self._learned[:-self.max_learned]:
+                    self._keys.discard(idea_key(idea))
+                del self._learned[:-self.max_learned]
+            self._stale = True
+            if self.learned_path:
+                if self._file_lines + len(added) > 2 * self.max_learned:
+                    self._compact()
+                else:
+                    with open(self.learned_path, 'a') as f:
+                        f.writelines(json.dumps(idea) + '\n' for idea in added)
+                    self._file_lines += len(added)
+        return len(added)
+
+    def _compact(self):
+        """Rewrite the learned file with only the kept ideas"""
+        directory = os.path.dirname(os.path.abspath(self.learned_path))
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.writelines(json.dumps(idea) + '\n' for idea in self._learned)
+            os.replace(temp, self.learned_path)
+        except OSError:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+        self._file_lines = len(self._learned)
+
+    def stats(self):
+        return {
+            "ideas": len(self._curated) + len(self._learned),
+            "learned": len(self._learned),
+            "searches": self.searches
+        }
+
+
+def render_ideas(ideas, languages, topics, frameworks):
+    """Format retrieved ideas like a model-written recommendation"""
+    known = {token for value in list(languages) + list(topics) + list(frameworks) for token in tokenize(value)}
+    sections = []
+    for number, idea in enumerate(ideas, 1):
+        matches = [tech for tech in idea.get('tech', []) if known & set(tokenize(tech))]
+        why = (f"It builds directly on your experience with {', '.join(matches)}."
+               if matches else "It fits the themes that show up across your repositories.")
+        features = '\n'.join(f"• {feature}" for feature in idea.get('features', []))
+        sections.append(
+            f"**🚀 Project {number}: {idea['name']}**\n\n"
+            f"**Category**: {idea.get('category', '')}\n\n"
+            f"**Description**: {idea['description']}\n\n"
+            f"**Tech Stack**: {', '.join(idea.get('tech', []))}\n\n"
+            f"**Key Features**:\n{features}\n\n"
+            f"**Difficulty**: {idea.get('difficulty') or 'Intermediate'}\n\n"
+            f"**Why Perfect for You**: {why}\n\n"
+            "---"
+        )
+    return '\n\n'.join(sections)
+
+
+def learned_ideas_path():
+    """IDEAS_LEARNED_PATH, by default next to the service's other state files (None keeps ideas in memory)"""
+    path = os.getenv('IDEAS_LEARNED_PATH')
+    if path is not None:
+        return path or None
+    state = os.getenv('PROFILE_STORE_PATH') or os.getenv('JOB_DB_PATH', 'jobs.db')
+    return os.path.join(os.path.dirname(state), 'learned-ideas.jsonl')
+
+
+def create_idea_index():
+    """Create the idea index from environment configuration"""
+    return IdeaIndex(
+        load_ideas(os.getenv('IDEAS_PATH', DEFAULT_IDEAS)),
+        learned_path=learned_ideas_path(),
+        max_learned=int(os.getenv('IDEAS_MAX_LEARNED', '500'))
+    )
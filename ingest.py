@@ -0,0 +1,282 @@
+"""
+Paginated repository ingestion.
+Walks every page of a user's search_repositories results with a bounded number
+of page requests in flight and folds each page into a running weighted profile,
+so only the profile and one small record per repository are held, never the
+pages themselves.
+Ingestion stops at a repository cap or once the top skills stop changing;
+incremental ingestion stops at the first repository not updated since a
+stored watermark.
+"""
+
+import asyncio
+import math
+import os
+import time
+
+from skill_profile import DEFAULT_HALF_LIFE_DAYS, Profile
+
+# GitHub's search API returns at most 100 items per page and 1000 per query
+MAX_PER_PAGE = 100
+SEARCH_RESULT_LIMIT = 1000
+
+
+def repository_search(username, page, per_page):
+    """search_repositories arguments for one page of a user's repositories"""
+    return {
+        "query": f"user:{username}",
+        "sort": "updated",
+        "per_page": per_page,
+        "page": page
+    }
+
+
+def page_count(first_result, per_page, max_repos):
+    """Number of pages to fetch, or None when the total is not reported"""
+    total = first_result.get("data", {}).get("total_count")
+    if not isinstance(total, int):
+        return None
+    limit = min(total, max_repos, SEARCH_RESULT_LIMIT)
+    return max(1, math.ceil(limit / per_page))
+
+
+def capped(items, seen, max_repos):
+    """Trim a page so no more than max_repos repositories are ingested"""
+    return items[:max(0, max_repos - seen)]
+
+
+def repository_pages(call_tool, username, resolve, executor, per_page=MAX_PER_PAGE,
+                     max_repos=SEARCH_RESULT_LIMIT, workers=4):
+    """Yield lists of repositories page by page, in order
+
+    resolve(result) turns a search_repositories result into its list of
+    repositories (raising on failure). Up to workers pages are fetched ahead
+    on executor; closing the generator cancels pages not yet started.
+    """
+    per_page = min(per_page, MAX_PER_PAGE)
+    first = call_tool("search_repositories", repository_search(username, 1, per_page))
+    items = resolve(first)
+    pages = page_count(first, per_page, max_repos)
+    seen = 0
+
+    items = capped(items, seen, max_repos)
+    seen += len(items)
+    yield items
+
+    if pages is None:
+        # Total not reported: walk pages one at a time until a short page
+        page = 2
+        while len(items) == per_page and seen < max_repos:
+            items = capped(resolve(call_tool("search_repositories", repository_search(username, page, per_page))),
+                           seen, max_repos)
+            seen += len(items)
+            yield items
+            page += 1
+        return
+
+    pending = []
+    next_page = 2
+    try:
+        while next_page <= pages or pending:
+            while next_page <= pages and len(pending) < workers:
+                pending.append(executor.submit(
+                    call_tool, "search_repositories", repository_search(username, next_page, per_page)
+                ))
+                next_page += 1
+            items = capped(resolve(pending.pop(0).result()), seen, max_repos)
+            seen += len(items)
+            yield items
+            if not items:
+                break
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def repository_pages_async(call_tool, username, resolve, per_page=MAX_PER_PAGE,
+                                 max_repos=SEARCH_RESULT_LIMIT, workers=4):
+    """repository_pages() for a coroutine call_tool; prefetched pages are tasks"""
+    per_page = min(per_page, MAX_PER_PAGE)
+    first = await call_tool("search_repositories", repository_search(username, 1, per_page))
+    items = resolve(first)
+    pages = page_count(first, per_page, max_repos)
+    seen = 0
+
+    items = capped(items, seen, max_repos)
+    seen += len(items)
+    yield items
+
+    if pages is None:
+        page = 2
+        while len(items) == per_page and seen < max_repos:
+            result = await call_tool("search_repositories", repository_search(username, page, per_page))
+            items = capped(resolve(result), seen, max_repos)
+            seen += len(items)
+            yield items
+            page += 1
+        return
+
+    pending = []
+    next_page = 2
+    try:
+        while next_page <= pages or pending:
+            while next_page <= pages and len(pending) < workers:
+                pending.append(asyncio.ensure_future(
+                    call_tool("search_repositories", repository_search(username, next_page, per_page))
+                ))
+                next_page += 1
+            items = capped(resolve(await pending.pop(0)), seen, max_repos)
+            seen += len(items)
+            yield items
+            if not items:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def repo_text(repo):
+    """Repository name and description, scanned for technologies"""
+    return f"{repo.get('name', '')} {repo.get('description') or ''}"
+
+
+def repo_key(repo):
+    """Stable identifier of a repository across renames"""
+    return str(repo.get('id') or repo.get('full_name') or repo.get('name'))
+
+
+class SkillAggregate:
+    """Running weighted profile over ingested repositories
+
+    With keep_contributions, each repository's contribution is kept too, as
+    a serialized record of a few hundred bytes, so a stored profile can later
+    swap out the old contribution of a repository that was updated. Without
+    it only the repository keys are kept, to skip repositories seen twice.
+    """
+
+    def __init__(self, match_skills, half_life_days=DEFAULT_HALF_LIFE_DAYS, keep_contributions=True):
+        self.match_skills = match_skills
+        self.half_life_days = half_life_days
+        # One reference time for the whole ingestion keeps contributions comparable
+        self.reference = time.time()
+        self.profile = Profile(self.reference, half_life_days)
+        self.keep_contributions = keep_contributions
+        # Repository key -> serialized contribution (None when not kept)
+        self.contributions = {}
+        self.watermark = ''
+        self.pages = 0
+        self.stopped_early = False
+
+    @property
+    def repos(self):
+        return self.profile.repos
+
+    def add(self, repo):
+        contribution = Profile(self.reference, self.half_life_days)
+        contribution.add_repo(repo, self.match_skills(repo_text(repo)))
+        key = repo_key(repo)
+        if key in self.contributions:
+            # Pages shifted while paging and the repository was seen twice
+            if not self.keep_contributions:
+                return
+            self.profile.merge(Profile.from_bytes(self.contributions[key]), -1)
+        self.contributions[key] = contribution.to_bytes() if self.keep_contributions else None
+        self.profile.merge(contribution)
+        self.watermark = max(self.watermark, repo.get('updated_at') or '')
+
+    def top(self, languages=5, topics=10, frameworks=8):
+        """Heaviest languages, topics and technologies so far"""
+        return self.profile.top(languages, topics, frameworks)
+
+
+def fold_page(aggregate, items, previous_top, unchanged):
+    """Add a page to aggregate; return the new top skills and unchanged-page streak"""
+    for repo in items:
+        aggregate.add(repo)
+    aggregate.pages += 1
+    top = aggregate.top()
+    return top, (unchanged + 1 if top == previous_top else 0)
+
+
+def ingest_steps(pages, aggregate, stable_pages=0):
+    """ingest() that yields after each page, so callers can interleave other work"""
+    top, unchanged = None, 0
+    try:
+        for items in pages:
+            top, unchanged = fold_page(aggregate, items, top, unchanged)
+            yield aggregate
+            if stable_pages and unchanged >= stable_pages:
+                aggregate.stopped_early = True
+                break
+    finally:
+        pages.close()
+
+
+def ingest(pages, aggregate, stable_pages=0):
+    """Fold pages into aggregate, stopping once the top skills hold for stable_pages pages"""
+    for _ in ingest_steps(pages, aggregate, stable_pages):
+        pass
+    return aggregate
+
+
+async def ingest_async(pages, aggregate, stable_pages=0):
+    """ingest() for an async generator of pages"""
+    top, unchanged = None, 0
+    try:
+        async for items in pages:
+            top, unchanged = fold_page(aggregate, items, top, unchanged)
+            if stable_pages and unchanged >= stable_pages:
+                aggregate.stopped_early = True
+                break
+    finally:
+        await pages.aclose()
+    return aggregate
+
+
+def updated_after(repo, watermark):
+    return (repo.get('updated_at') or '') > watermark
+
+
+def ingest_since(pages, aggregate, watermark):
+    """Fold repositories updated after watermark, reading pages only until an older one
+
+    Pages must be sorted by updated_at, newest first.
+    """
+    try:
+        for items in pages:
+            aggregate.pages += 1
+            for repo in items:
+                if not updated_after(repo, watermark):
+                    return aggregate
+                aggregate.add(repo)
+    finally:
+        pages.close()
+    return aggregate
+
+
+async def ingest_since_async(pages, aggregate, watermark):
+    """ingest_since() for an async generator of pages"""
+    try:
+        async for items in pages:
+            aggregate.pages += 1
+            for repo in items:
+                if not updated_after(repo, watermark):
+                    return aggregate
+                aggregate.add(repo)
+    finally:
+        await pages.aclose()
+    return aggregate
+
+
+def ingest_settings():
+    """Pagination settings from environment configuration"""
+    return {
+        "per_page": int(os.getenv('INGEST_PER_PAGE', MAX_PER_PAGE)),
+        "max_repos": int(os.getenv('INGEST_MAX_REPOS', '300')),
+        "workers": int(os.getenv('INGEST_WORKERS', '4'))
+    }
+
+
+def stable_pages_setting():
+    """Unchanged pages after which ingestion stops early (0 disables)"""
+    return int(os.getenv('INGEST_STABLE_PAGES', '2'))
@@ -0,0 +1,397 @@
+"""
+Background job subsystem for long-running analyses.
+Submitting a job returns an id immediately; worker threads drain the queue
+and store results with an expiry so clients can poll or long-poll for them.
+The in-memory backend suits a single process; the SQLite backend persists
+jobs and lets several worker processes share one queue. Running jobs hold a
+lease that their worker renews; a job whose worker died is requeued once
+the lease lapses, and jobs that never finish expire.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+# How often waiters re-check a store that other processes may update
+POLL_INTERVAL = 0.5
+
+DEFAULT_LEASE = 60
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_MAX_AGE = 3600
+
+# Seconds a worker waits after a store error before trying again
+ERROR_BACKOFF = 1.0
+
+EXPIRED_ERROR = "Job expired before it finished"
+ABANDONED_ERROR = "Job was abandoned by its worker too many times"
+
+
+def new_job(payload, priority=0):
+    """Create a queued job record"""
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "status": QUEUED,
+        "priority": priority,
+        "payload": payload,
+        "result": None,
+        "error": None,
+        "attempts": 0,
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": None
+    }
+
+
+class MemoryJobStore:
+    """In-process job queue and result store
+
+    Jobs not finished max_age seconds after they were submitted fail as
+    expired.
+    """
+
+    def __init__(self, ttl=3600, max_age=DEFAULT_MAX_AGE):
+        self.ttl = ttl
+        self.max_age = max_age
+        self._jobs = {}
+        self._queue = queue.PriorityQueue()
+        self._cond = threading.Condition()
+
+    def enqueue(self, job):
+        with self._cond:
+            self._jobs[job["id"]] = job
+        self._queue.put((job["priority"], job["created_at"], job["id"]))
+
+    def claim(self, timeout=None):
+        """Take the next queued job and mark it running, or return None"""
+        try:
+            _, _, job_id = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self._cond:
+            self._purge()
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                return None
+            job.update(status=RUNNING, attempts=job["attempts"] + 1, updated_at=time.time())
+            return dict(job)
+
+    def renew(self, job_id, attempt):
+        """Extend the lease on a running job"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] == RUNNING and job["attempts"] == attempt:
+                job["updated_at"] = time.time()
+
+    def finish(self, job_id, status, result=None, error=None, attempt=None):
+        """Store a job's outcome, unless the job was taken from this attempt's worker"""
+        now = time.time()
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and (attempt is None or (job["status"] == RUNNING and job["attempts"] == attempt)):
+                job.update(status=status, result=result, error=error,
+                           updated_at=now, expires_at=now + self.ttl)
+            self._cond.notify_all()
+
+    def get(self, job_id):
+        with self._cond:
+            self._purge()
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id, timeout):
+        """Return the job once finished, or as-is after timeout seconds"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                self._purge()
+                job = self._jobs.get(job_id)
+                remaining = deadline - time.time()
+                if job is None or job["status"] in FINISHED or remaining <= 0:
+                    return dict(job) if job else None
+                self._cond.wait(remaining)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _purge(self):
+        now = time.time()
+        for job in self._jobs.values():
+            if job["status"] not in FINISHED and job["created_at"] <= now - self.max_age:
+                job.update(status=FAILED, error=EXPIRED_ERROR, updated_at=now, expires_at=now + self.ttl)
+        expired = [k for k, j in self._jobs.items() if j["expires_at"] and j["expires_at"] <= now]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    """Job queue and result store persisted in SQLite
+
+    A running job's updated_at is its lease: workers renew it while they
+    work, and a job whose lease is older than lease seconds is requeued, or
+    failed after max_attempts claims. Jobs not finished max_age seconds
+    after they were submitted fail as expired.
+    """
+
+    COLUMNS = ("id", "status", "priority", "payload", "result", "error",
+               "attempts", "created_at", "updated_at", "expires_at")
+
+    def __init__(self, path, ttl=3600, lease=DEFAULT_LEASE, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 max_age=DEFAULT_MAX_AGE):
+        self.ttl = ttl
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.max_age = max_age
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, priority INTEGER NOT NULL, "
+                "payload TEXT, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL, expires_at REAL)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "attempts" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at)"
+            )
+
+    def _row_to_job(self, row):
+        job = dict(zip(self.COLUMNS, row))
+        job["payload"] = json.loads(job["payload"]) if job["payload"] else None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, job):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                (job["id"], job["status"], job["priority"], json.dumps(job["payload"]), None, None,
+                 0, job["created_at"], job["updated_at"], None)
+            )
+        with self._cond:
+            self._cond.notify_all()
+
+    def claim(self, timeout=None):
+        """Take the next queued job and mark it running, or return None"""
+        deadline = time.time() + (timeout or 0)
+        while True:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._reap(time.time())
+                    row = self._conn.execute(
+                        f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE status = ? "
+                        "ORDER BY priority, created_at LIMIT 1", (QUEUED,)
+                    ).fetchone()
+                    if row is not None:
+                        self._conn.execute(
+                            "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                            (RUNNING, time.time(), row[0])
+                        )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            if row is not None:
+                job = self._row_to_job(row)
+                job["status"] = RUNNING
+                job["attempts"] += 1
+                return job
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            with self._cond:
+                self._cond.wait(min(remaining, POLL_INTERVAL))
+
+    def _reap(self, now):
+        """Requeue jobs whose lease lapsed and fail abandoned or expired ones; caller holds the lock"""
+        stale = now - self.lease
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ?, expires_at = ? "
+            "WHERE status = ? AND updated_at <= ? AND attempts >= ?",
+            (FAILED, ABANDONED_ERROR, now, now + self.ttl, RUNNING, stale, self.max_attempts)
+        )
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ? AND updated_at <= ?",
+            (QUEUED, now, RUNNING, stale)
+        )
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ?, expires_at = ? "
+            "WHERE status IN (?, ?) AND created_at <= ?",
+            (FAILED, EXPIRED_ERROR, now, now + self.ttl, QUEUED, RUNNING, now - self.max_age)
+        )
+        self._conn.execute(
+            "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+
+    def renew(self, job_id, attempt):
+        """Extend the lease on a running job"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (time.time(), job_id, RUNNING, attempt)
+            )
+
+    def finish(self, job_id, status, result=None, error=None, attempt=None):
+        """Store a job's outcome, unless the job was requeued away from this attempt's worker"""
+        now = time.time()
+        query = "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?, expires_at = ? WHERE id = ?"
+        params = (status, json.dumps(result) if result is not None else None, error, now, now + self.ttl, job_id)
+        if attempt is not None:
+            query += " AND status = ? AND attempts = ?"
+            params += (RUNNING, attempt)
+        with self._lock:
+            self._conn.execute(query, params)
+        with self._cond:
+            self._cond.notify_all()
+
+    def get(self, job_id):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._reap(time.time())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def wait(self, job_id, timeout):
+        """Return the job once finished, or as-is after timeout seconds"""
+        deadline = time.time() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.time()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                return job
+            with self._cond:
+                self._cond.wait(min(remaining, POLL_INTERVAL))
+
+    def depth(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+
+
+class JobManager:
+    """Runs queued jobs through a handler on a pool of worker threads"""
+
+    def __init__(self, store, handler, workers=2, heartbeat=None):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        # Renew well inside the store's lease so a busy worker never loses its job
+        self.heartbeat = heartbeat or getattr(store, 'lease', DEFAULT_LEASE) / 3
+        self._threads = []
+        self._running = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def submit(self, payload, priority=0):
+        """Queue a job and return its id"""
+        job = new_job(payload, priority)
+        self.store.enqueue(job)
+        return job["id"]
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim(timeout=1)
+            except Exception as e:
+                # e.g. "database is locked" while other processes hold the queue
+                print(f"⚠️ Could not claim a job: {e}")
+                self._stop.wait(ERROR_BACKOFF)
+                continue
+            if job is None:
+                continue
+            with self._lock:
+                self._running[job["id"]] = job["attempts"]
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self._running.pop(job["id"], None)
+
+    def _run(self, job):
+        try:
+            outcome = {"status": DONE, "result": self.handler(job["payload"], job["priority"])}
+        except Exception as e:
+            outcome = {"status": FAILED, "error": str(e)}
+        try:
+            self.store.finish(job["id"], attempt=job["attempts"], **outcome)
+        except Exception as e:
+            # The lease is no longer renewed, so the job is reaped and retried
+            print(f"⚠️ Could not store the outcome of job {job['id']}: {e}")
+            self._stop.wait(ERROR_BACKOFF)
+
+    def _renew(self):
+        """Keep the leases of running jobs alive while their handlers work"""
+        while not self._stop.wait(self.heartbeat):
+            with self._lock:
+                running = list(self._running.items())
+            for job_id, attempt in running:
+                try:
+                    self.store.renew(job_id, attempt)
+                except Exception as e:
+                    print(f"⚠️ Could not renew job {job_id}: {e}")
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if not self._threads:
+                for i in range(self.workers):
+                    thread = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+                thread = threading.Thread(target=self._renew, name='job-heartbeat', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {"workers": self.workers, "queue_depth": self.store.depth()}
+
+
+def public_job(job):
+    """Job fields returned to API clients"""
+    return {k: job[k] for k in ("id", "status", "result", "error", "created_at", "updated_at")}
+
+
+def create_job_store():
+    """Create the job store selected by JOB_BACKEND"""
+    ttl = float(os.getenv('JOB_TTL', '3600'))
+    max_age = float(os.getenv('JOB_MAX_AGE', str(DEFAULT_MAX_AGE)))
+    if os.getenv('JOB_BACKEND', 'memory') == 'sqlite':
+        return SQLiteJobStore(
+            os.getenv('JOB_DB_PATH', 'jobs.db'),
+            ttl=ttl,
+            lease=float(os.getenv('JOB_LEASE', str(DEFAULT_LEASE))),
+            max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', str(DEFAULT_MAX_ATTEMPTS))),
+            max_age=max_age
+        )
+    return MemoryJobStore(ttl=ttl, max_age=max_age)
@@ -0,0 +1,62 @@
+"""
+Shared OpenAI client registry.
+Every OpenAI client owns an httpx connection pool, so clients are created once
+per provider and base URL and then reused for every completion in the process.
+AsyncOpenAI clients for the async (ASGI) mode are registered separately.
+"""
+
+import os
+import threading
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 10
+DEFAULT_TIMEOUT = 120
+DEFAULT_CONNECT_TIMEOUT = 10
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def http_limits():
+    """Connection pool limits for model endpoints"""
+    return httpx.Limits(
+        max_connections=int(os.getenv('LLM_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(os.getenv('LLM_MAX_KEEPALIVE', DEFAULT_MAX_KEEPALIVE))
+    )
+
+
+def http_timeout():
+    """Request timeouts for model endpoints"""
+    return httpx.Timeout(
+        float(os.getenv('LLM_TIMEOUT', DEFAULT_TIMEOUT)),
+        connect=float(os.getenv('LLM_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT))
+    )
+
+
+def _get_client(client_class, http_client_class, provider, base_url, api_key):
+    key = (client_class, provider, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            timeout = http_timeout()
+            client = client_class(
+                base_url=base_url,
+                api_key=api_key,
+                timeout=timeout,
+                http_client=http_client_class(limits=http_limits(), timeout=timeout)
+            )
+            _clients[key] = client
+        return client
+
+
+def get_ai_client(provider, base_url=None, api_key=None):
+    """Return the process-wide OpenAI client for a provider and base URL"""
+    return _get_client(OpenAI, httpx.Client, provider, base_url, api_key)
+
+
+def get_async_ai_client(provider, base_url=None, api_key=None):
+    """Return the process-wide AsyncOpenAI client for a provider and base URL"""
+    return _get_client(AsyncOpenAI, httpx.AsyncClient, provider, base_url, api_key)
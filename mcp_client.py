@@ -0,0 +1,180 @@
+"""
+Shared MCP Gateway client.
+Keeps a pooled, keep-alive HTTP session to the gateway so tool calls reuse
+connections instead of opening a fresh TCP connection per request. An asyncio
+variant serves the async (ASGI) mode.
+"""
+
+import itertools
+import os
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 10
+
+# Tools that legitimately run longer than a search lookup
+DEFAULT_TOOL_TIMEOUTS = {
+    'run_js': 60,
+}
+
+
+def parse_tool_seconds(spec):
+    """Parse a "tool=seconds,tool=seconds" string into a dict"""
+    timeouts = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, value = item.split('=', 1)
+        try:
+            timeouts[name.strip()] = float(value)
+        except ValueError:
+            print(f"⚠️ Ignoring invalid setting for {name.strip()}: {value}")
+    return timeouts
+
+
+def tool_result(response):
+    """Convert a tools/call HTTP response into {"success": ..., "data"/"error": ...}"""
+    if response.status_code == 200:
+        result = response.json()
+        if "result" in result:
+            return {"success": True, "data": result["result"]}
+        else:
+            return {"success": False, "error": result.get("error", "Unknown error")}
+    else:
+        return {"success": False, "error": f"HTTP {response.status_code}"}
+
+
+class BaseMCPClient:
+    """Request ids and timeouts shared by the sync and async clients"""
+
+    def __init__(self, base_url, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 tool_timeouts=None):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.tool_timeouts = dict(DEFAULT_TOOL_TIMEOUTS)
+        self.tool_timeouts.update(tool_timeouts or {})
+
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+
+    def next_id(self):
+        """Return the next JSON-RPC request id"""
+        with self._id_lock:
+            return next(self._ids)
+
+    def timeout_for(self, tool_name):
+        """Return the timeout in seconds for a tool"""
+        return self.tool_timeouts.get(tool_name, self.timeout)
+
+    def request_body(self, method, params):
+        return {
+            "jsonrpc": "2.0",
+            "id": self.next_id(),
+            "method": method,
+            "params": params
+        }
+
+
+class MCPClient(BaseMCPClient):
+    """JSON-RPC client for the MCP Gateway /mcp endpoint"""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+
+    def post(self, method, params, timeout=None):
+        """Send a JSON-RPC request and return the raw HTTP response"""
+        return self.session.post(
+            f"{self.base_url}/mcp",
+            json=self.request_body(method, params),
+            timeout=timeout or self.timeout
+        )
+
+    def call_tool(self, tool_name, arguments, timeout=None):
+        """Call an MCP tool and return {"success": ..., "data"/"error": ...}"""
+        try:
+            return tool_result(self.post(
+                "tools/call",
+                {"name": tool_name, "arguments": arguments},
+                timeout=timeout or self.timeout_for(tool_name)
+            ))
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+
+class AsyncMCPClient(BaseMCPClient):
+    """asyncio JSON-RPC client for the MCP Gateway, bound to one event loop"""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.session = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size
+            ),
+            headers={'Content-Type': 'application/json'}
+        )
+
+    async def post(self, method, params, timeout=None):
+        """Send a JSON-RPC request and return the raw HTTP response"""
+        return await self.session.post(
+            f"{self.base_url}/mcp",
+            json=self.request_body(method, params),
+            timeout=timeout or self.timeout
+        )
+
+    async def call_tool(self, tool_name, arguments, timeout=None):
+        """Call an MCP tool and return {"success": ..., "data"/"error": ...}"""
+        try:
+            return tool_result(await self.post(
+                "tools/call",
+                {"name": tool_name, "arguments": arguments},
+                timeout=timeout or self.timeout_for(tool_name)
+            ))
+        except Exception as e:
+            return {"success": False, "error": str(e) or type(e).__name__}
+
+    async def close(self):
+        """Close pooled connections"""
+        await self.session.aclose()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(client_class, base_url):
+    with _clients_lock:
+        client = _clients.get((client_class, base_url))
+        if client is None:
+            client = client_class(
+                base_url,
+                pool_size=int(os.getenv('MCP_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                timeout=float(os.getenv('MCP_TIMEOUT', DEFAULT_TIMEOUT)),
+                tool_timeouts=parse_tool_seconds(os.getenv('MCP_TOOL_TIMEOUTS'))
+            )
+            _clients[(client_class, base_url)] = client
+        return client
+
+
+def get_mcp_client(base_url):
+    """Return the process-wide MCP client for a gateway URL"""
+    return _get_client(MCPClient, base_url)
+
+
+def get_async_mcp_client(base_url):
+    """Return the process-wide asyncio MCP client for a gateway URL"""
+    return _get_client(AsyncMCPClient, base_url)
@@ -0,0 +1,362 @@
+"""
+Request tracing and Prometheus metrics.
+Analysis stages (each MCP tool call, repository ingestion, the model's time to
+first token and total generation) are timed into histograms served in the
+Prometheus text format on /metrics. Every request also carries a trace with a
+correlation id, and its stage timings are written as one JSON log line when
+the request finishes. Metrics are per process: with several uvicorn workers,
+each worker reports its own.
+"""
+
+import contextvars
+import functools
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds, from a cached lookup up to a long generation
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, math.inf)
+TOKEN_RATE_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 40, 60, 80, 100, 150, 250, math.inf)
+
+# Client-supplied X-Request-ID values are only reused when they look like ids
+REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, tuple(zip(self.labels, key)), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            labels = tuple(zip(self.labels, key))
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                yield f"{self.name}_bucket", labels + (('le', format_value(float(bound))),), cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class CallbackMetric:
+    """Metric read at scrape time: fn() returns (labels dict, value) pairs"""
+
+    def __init__(self, name, kind, help, fn):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.fn = fn
+
+    def samples(self):
+        for labels, value in self.fn():
+            yield self.name, tuple(labels.items()), value
+
+
+class Registry:
+    """Metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def callback(self, name, kind, help, fn):
+        return self.register(CallbackMetric(name, kind, help, fn))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                print(f"⚠️ Skipping metric {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{format_labels(labels)} {format_value(value)}" for name, labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter(
+    'hackathon_requests_total', 'HTTP requests by route and status', ('route', 'status'))
+REQUEST_SECONDS = REGISTRY.histogram(
+    'hackathon_request_seconds', 'HTTP request latency, including streamed bodies', ('route',))
+STAGE_SECONDS = REGISTRY.histogram(
+    'hackathon_stage_seconds', 'Time spent in each analysis stage', ('stage',))
+MCP_TOOL_SECONDS = REGISTRY.histogram(
+    'hackathon_mcp_tool_seconds', 'MCP tool call latency (cache hits excluded)', ('tool', 'outcome'))
+LLM_TTFT_SECONDS = REGISTRY.histogram(
+    'hackathon_llm_time_to_first_token_seconds', 'Time from sending a streamed completion to its first token')
+LLM_SECONDS = REGISTRY.histogram(
+    'hackathon_llm_request_seconds', 'Model completion latency', ('mode', 'outcome'))
+LLM_TOKENS_PER_SECOND = REGISTRY.histogram(
+    'hackathon_llm_tokens_per_second', 'Generated tokens per second (after the first token when streaming)',
+    ('mode',), TOKEN_RATE_BUCKETS)
+LLM_COMPLETION_TOKENS = REGISTRY.counter(
+    'hackathon_llm_completion_tokens_total', 'Tokens generated by the model', ('mode',))
+
+_caches = {}
+
+
+def cache_samples(field):
+    return lambda: [({"cache": name}, stats()[field]) for name, stats in list(_caches.items())]
+
+
+REGISTRY.callback('hackathon_cache_hits_total', 'counter', 'Cache lookups that found an entry', cache_samples('hits'))
+REGISTRY.callback('hackathon_cache_misses_total', 'counter', 'Cache lookups that missed', cache_samples('misses'))
+REGISTRY.callback('hackathon_cache_hit_ratio', 'gauge', 'Share of cache lookups that hit', cache_samples('hit_rate'))
+REGISTRY.callback('hackathon_cache_entries', 'gauge', 'Entries held in each cache', cache_samples('size'))
+
+
+def watch_cache(name, stats):
+    """Export a cache's stats() hits, misses, hit_rate and size"""
+    _caches[name] = stats
+
+
+class Trace:
+    """Stage timings and log fields of one request"""
+
+    def __init__(self, route, request_id=None):
+        self.route = route
+        self.request_id = request_id if request_id and REQUEST_ID.match(request_id) else uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.fields = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+def begin(route, request_id=None):
+    """Start a request trace and make it current"""
+    trace = Trace(route, request_id)
+    current_trace.set(trace)
+    return trace
+
+
+def end(trace, status):
+    """Record a finished request and write its JSON log line"""
+    duration = time.perf_counter() - trace.started
+    REQUESTS.inc(route=trace.route, status=status)
+    REQUEST_SECONDS.observe(duration, route=trace.route)
+    if current_trace.get() is trace:
+        current_trace.set(None)
+    if os.getenv('REQUEST_LOG', 'json') == 'json':
+        with trace._lock:
+            stages = {stage: round(seconds * 1000, 1) for stage, seconds in trace.stages.items()}
+        record = {
+            "ts": time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime()) + 'Z',
+            "request_id": trace.request_id,
+            "route": trace.route,
+            "status": status,
+            "duration_ms": round(duration * 1000, 1),
+            "stages_ms": stages,
+            **trace.fields
+        }
+        sys.stdout.write(json.dumps(record, default=str) + '\n')
+        sys.stdout.flush()
+
+
+def annotate(**fields):
+    """Add fields to the current request's log line"""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.fields.update(fields)
+
+
+def request_id():
+    """Correlation id of the current request, or None outside one"""
+    trace = current_trace.get()
+    return trace.request_id if trace is not None else None
+
+
+def trace_stage(stage, seconds):
+    """Add time to a stage of the current request's trace only"""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+def record_stage(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    trace_stage(stage, seconds)
+
+
+@contextmanager
+def stage(name):
+    """Time a block as an analysis stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def traced(fn):
+    """Bind fn to the current trace so calls on worker threads are attributed to it"""
+    trace = current_trace.get()
+
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        token = current_trace.set(trace)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            current_trace.reset(token)
+    return call
+
+
+def tool_outcome(result):
+    return 'ok' if result.get("success") else 'error'
+
+
+def timed_tool(call_tool):
+    """Wrap an MCP call_tool(tool_name, arguments) to record its latency"""
+    @functools.wraps(call_tool)
+    def call(tool_name, arguments, *args, **kwargs):
+        start = time.perf_counter()
+        result = call_tool(tool_name, arguments, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        MCP_TOOL_SECONDS.observe(elapsed, tool=tool_name, outcome=tool_outcome(result))
+        trace_stage(f"mcp.{tool_name}", elapsed)
+        return result
+    return call
+
+
+def timed_tool_async(call_tool):
+    """timed_tool() for a coroutine call_tool"""
+    @functools.wraps(call_tool)
+    async def call(tool_name, arguments, *args, **kwargs):
+        start = time.perf_counter()
+        result = await call_tool(tool_name, arguments, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        MCP_TOOL_SECONDS.observe(elapsed, tool=tool_name, outcome=tool_outcome(result))
+        trace_stage(f"mcp.{tool_name}", elapsed)
+        return result
+    return call
+
+
+class Generation:
+    """Times one model completion: first token, total and tokens per second"""
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.first_token_at = None
+
+    def token(self):
+        """Mark a streamed token; the first one records time to first token"""
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            ttft = self.first_token_at - self.started
+            LLM_TTFT_SECONDS.observe(ttft)
+            trace_stage('llm_ttft', ttft)
+
+    def finish(self, tokens=None, outcome='ok'):
+        """Record the completion; tokens is how many were generated, if known"""
+        elapsed = time.perf_counter() - self.started
+        LLM_SECONDS.observe(elapsed, mode=self.mode, outcome=outcome)
+        record_stage('llm', elapsed)
+        if outcome != 'ok' or not tokens:
+            return
+        LLM_COMPLETION_TOKENS.inc(tokens, mode=self.mode)
+        if self.first_token_at is not None and tokens > 1:
+            rate = (tokens - 1) / max(time.perf_counter() - self.first_token_at, 1e-6)
+        else:
+            rate = tokens / max(elapsed, 1e-6)
+        LLM_TOKENS_PER_SECOND.observe(rate, mode=self.mode)
+        annotate(completion_tokens=tokens)
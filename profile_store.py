@@ -0,0 +1,112 @@
+"""
+Persisted developer profiles for incremental refresh.
+Stores each user's aggregated profile with the updated_at watermark of the
+newest repository it covers, plus every repository's own contribution. A
+returning user only needs the repositories updated since the watermark: their
+old contributions are subtracted and the new ones added.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from skill_profile import Profile
+
+StoredProfile = namedtuple('StoredProfile', ['user_info', 'profile', 'watermark', 'rebuilt_at'])
+
+
+def profile_key(username):
+    return username.strip().lstrip('@').lower()
+
+
+class ProfileStore:
+    """SQLite store of profiles and per-repository contributions"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "username TEXT PRIMARY KEY, user_info TEXT NOT NULL, profile BLOB NOT NULL, "
+                "watermark TEXT NOT NULL, rebuilt_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS contributions ("
+                "username TEXT NOT NULL, repo TEXT NOT NULL, contribution BLOB NOT NULL, "
+                "PRIMARY KEY (username, repo))"
+            )
+
+    def load(self, username):
+        """Return the StoredProfile for username, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT user_info, profile, watermark, rebuilt_at FROM profiles WHERE username = ?",
+                (profile_key(username),)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            profile = Profile.from_bytes(row[1])
+        except ValueError:
+            # Written by an older format: treat as missing so it is rebuilt
+            return None
+        return StoredProfile(json.loads(row[0]), profile, row[2], row[3])
+
+    def _write_contributions(self, key, contributions):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO contributions (username, repo, contribution) VALUES (?, ?, ?)",
+            [(key, repo, contribution) for repo, contribution in contributions.items()]
+        )
+
+    def replace(self, username, user_info, aggregate):
+        """Store a fully rebuilt profile, dropping every earlier contribution"""
+        key = profile_key(username)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM contributions WHERE username = ?", (key,))
+            self._write_contributions(key, aggregate.contributions)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles "
+                "(username, user_info, profile, watermark, rebuilt_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(user_info), aggregate.profile.to_bytes(), aggregate.watermark, now, now)
+            )
+        return StoredProfile(user_info, aggregate.profile, aggregate.watermark, now)
+
+    def apply(self, username, delta):
+        """Swap in the contributions of updated repositories and advance the watermark"""
+        key = profile_key(username)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT user_info, profile, watermark, rebuilt_at FROM profiles WHERE username = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            profile = Profile.from_bytes(row[1])
+            for repo, contribution in delta.contributions.items():
+                old = self._conn.execute(
+                    "SELECT contribution FROM contributions WHERE username = ? AND repo = ?", (key, repo)
+                ).fetchone()
+                if old is not None:
+                    profile.merge(Profile.from_bytes(old[0]), -1)
+                profile.merge(Profile.from_bytes(contribution))
+            self._write_contributions(key, delta.contributions)
+            watermark = max(row[2], delta.watermark)
+            self._conn.execute(
+                "UPDATE profiles SET profile = ?, watermark = ?, updated_at = ? WHERE username = ?",
+                (profile.to_bytes(), watermark, time.time(), key)
+            )
+        return StoredProfile(json.loads(row[0]), profile, watermark, row[3])
+
+
+def create_profile_store():
+    """Create the profile store from environment configuration (None if disabled)"""
+    path = os.getenv('PROFILE_STORE_PATH', 'profiles.db')
+    return ProfileStore(path) if path else None
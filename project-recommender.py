@@ -1,3 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from ingest import ingest_settings, repository_pages
+from trends import TrendsRefresher
+
 def analyze_github_user(username):
     """Analyze GitHub user profile and repositories using correct MCP tool names"""
     with st.spinner(f"🔍 Analyzing GitHub profile: @{username}"):
@@ -19,50 +24,54 @@ def analyze_github_user(username):
         
         user_info = users_data["items"][0]  # Get first user from search results
         
-        # Search for user's repositories using search_repositories tool
-        repos_result = call_mcp_tool("search_repositories", {
-            "query": f"user:{username}",
-            "sort": "updated",
-            "per_page": 20
-        })
-        
-        if not repos_result["success"]:
-            st.error(f"❌ Failed to search repositories: {repos_result.get('error', 'Unknown error')}")
+        # Page through the user's repositories using search_repositories tool
+        repositories = []
+        try:
+            for items in repository_pages(call_mcp_tool, username, repository_items,
+                                          get_page_executor(), **ingest_settings()):
+                repositories.extend(items)
+        except RepositorySearchError as e:
+            st.error(f"❌ Failed to search repositories: {e}")
             return None
         
-        repos_data = repos_result.get("data", {})
-        repositories = repos_data.get("items", [])
-        
         return {
             "user": user_info,
             "repositories": repositories
         }
 
+class RepositorySearchError(Exception):
+    """Raised when a page of search_repositories fails"""
+
+def repository_items(repos_result):
+    """Return the repositories from a search_repositories result"""
+    if not repos_result["success"]:
+        raise RepositorySearchError(repos_result.get('error', 'Unknown error'))
+    return repos_result.get("data", {}).get("items", [])
+
+@st.cache_resource
+def get_page_executor():
+    """Process-wide pool for fetching repository pages ahead"""
+    return ThreadPoolExecutor(max_workers=ingest_settings()["workers"], thread_name_prefix='repo-pages')
+
+HACKATHON_SEARCH_QUERIES = [
+    "AI hackathon 2025 trending projects",
+    "developer tools hackathon ideas", 
+    "open source hackathon themes"
+]
+
+@st.cache_resource
+def get_inspiration_refresher():
+    """Process-wide refresher that runs the inspiration searches in the background"""
+    # Limit to 2 searches
+    return TrendsRefresher(call_mcp_tool, HACKATHON_SEARCH_QUERIES[:2]).start()
+
 def search_hackathon_inspiration():
     """Search for current hackathon themes using DuckDuckGo search tool"""
-    with st.spinner("🔍 Searching for hackathon inspiration..."):
-        
-        search_queries = [
-            "AI hackathon 2025 trending projects",
-            "developer tools hackathon ideas", 
-            "open source hackathon themes"
-        ]
-        
-        all_results = []
-        for query in search_queries[:2]:  # Limit to 2 searches
-            result = call_mcp_tool("search", {
-                "query": query,
-                "max_results": 3
-            })
-            
-            if result["success"] and result.get("data"):
-                # Handle different response formats
-                data = result["data"]
-                if isinstance(data, list):
-                    all_results.extend(data)
-                elif isinstance(data, dict) and "results" in data:
-                    all_results.extend(data["results"])
-                elif isinstance(data, dict) and "items" in data:
-                    all_results.extend(data["items"])
-        
-        return all_results
+    refresher = get_inspiration_refresher()
+    
+    if not refresher.snapshot().updated_at:
+        # Nothing fetched yet; run the searches once in parallel
+        with st.spinner("🔍 Searching for hackathon inspiration..."):
+            refresher.refresh()
+    
+    return list(refresher.snapshot().results)
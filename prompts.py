@@ -0,0 +1,178 @@
+"""
+Prompt templates compiled once and rendered to a token budget.
+A template's static text is split from its {placeholders} and measured when it
+is compiled. At render time each variable section is capped to its own limit,
+and if the prompt still would not fit the model context, the largest sections
+are trimmed further until it does. Token counts come from tiktoken when it is
+installed and from a fast regex estimate otherwise.
+"""
+
+import os
+import re
+import string
+import threading
+from collections import namedtuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_CONTEXT_SIZE = 15000
+
+# Headroom for the difference between our count and the model's tokenizer
+DEFAULT_MARGIN = 0.1
+
+# Estimate: each word or symbol is a token, and longer words add one token
+# per further CHARS_PER_TOKEN characters
+CHARS_PER_TOKEN = 4
+PIECE = re.compile(r"\w+|[^\w\s]")
+LONG_WORD = re.compile(r"\w{%d,}" % (CHARS_PER_TOKEN + 1))
+
+TRUNCATED = "[... {} tokens truncated ...]"
+
+# max_tokens caps a section on its own; min_tokens is how far budget trimming
+# may shrink it; keep is which part survives ('head', 'tail' or 'middle')
+Section = namedtuple('Section', ['max_tokens', 'min_tokens', 'keep'], defaults=(None, 0, 'head'))
+
+Prompt = namedtuple('Prompt', ['text', 'tokens', 'truncated'])
+
+
+class Tokenizer:
+    """Token counting and truncation, exact with tiktoken and estimated without"""
+
+    def __init__(self, encoding=None):
+        self.encoding = None
+        if tiktoken is not None and encoding:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding)
+            except Exception as e:
+                # The encoding file may need a download that is not possible offline
+                print(f"⚠️ Tokenizer {encoding} unavailable, estimating token counts: {e}")
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        extra = sum((len(word) - 1) // CHARS_PER_TOKEN for word in LONG_WORD.findall(text))
+        return len(PIECE.findall(text)) + extra
+
+    def _cut(self, text, tokens, keep, total):
+        """Shorten text to about tokens tokens, keeping its head or tail"""
+        if self.encoding is not None:
+            ids = self.encoding.encode(text, disallowed_special=())
+            ids = ids[:tokens] if keep == 'head' else ids[len(ids) - tokens:]
+            return self.encoding.decode(ids)
+        # Scale by the text's own characters-per-token ratio, then step back
+        # until the estimate fits
+        chars = len(text) * tokens // max(total, 1)
+        while True:
+            part = text[:chars] if keep == 'head' else text[len(text) - chars:]
+            if chars <= 0 or self.count(part) <= tokens:
+                return part
+            chars -= max(1, chars // 10)
+
+    def truncate(self, text, max_tokens, keep='head'):
+        """Fit text into max_tokens, marking what was cut"""
+        total = self.count(text)
+        if total <= max_tokens:
+            return text
+        marker_tokens = self.count(TRUNCATED.format(total))
+        room = max(0, max_tokens - marker_tokens)
+        marker = TRUNCATED.format(total - room)
+        if keep == 'middle':
+            head = self._cut(text, room - room // 2, 'head', total)
+            tail = self._cut(text, room // 2, 'tail', total)
+            return f"{head}\n{marker}\n{tail}"
+        if keep == 'tail':
+            return f"{marker}\n{self._cut(text, room, 'tail', total)}"
+        return f"{self._cut(text, room, 'head', total)} {marker}"
+
+
+def fit_items(tokenizer, items, max_tokens, separator=', '):
+    """Keep whole list items from the front while they fit in max_tokens"""
+    kept = []
+    for item in items:
+        if tokenizer.count(separator.join(kept + [item])) > max_tokens:
+            break
+        kept.append(item)
+    return separator.join(kept)
+
+
+class PromptTemplate:
+    """A str.format-style template whose variable sections share a token budget
+
+    sections maps placeholder names to Section limits; other placeholders are
+    short fixed values inserted as-is. List values are joined with ", " and
+    trimmed by whole items.
+    """
+
+    def __init__(self, text, sections=None, tokenizer=None):
+        self.sections = dict(sections or {})
+        self.tokenizer = tokenizer or get_tokenizer()
+        self._parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(text)]
+        self.static_tokens = sum(self.tokenizer.count(literal) for literal, _ in self._parts)
+
+    def _fit(self, value, max_tokens, keep):
+        if isinstance(value, (list, tuple)):
+            return fit_items(self.tokenizer, [str(item) for item in value], max_tokens)
+        return self.tokenizer.truncate(str(value), max_tokens, keep)
+
+    def render(self, budget=None, **values):
+        """Fill in the template, trimming sections so the prompt fits in budget tokens"""
+        texts = {}
+        counts = {}
+        truncated = []
+        for name, value in values.items():
+            section = self.sections.get(name)
+            text = ', '.join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+            if section is not None and section.max_tokens is not None:
+                fitted = self._fit(value, section.max_tokens, section.keep)
+                if fitted != text:
+                    text = fitted
+                    truncated.append(name)
+            texts[name] = text
+            counts[name] = self.tokenizer.count(text)
+
+        total = self.static_tokens + sum(counts.values())
+        if budget is not None and total > budget:
+            overflow = total - budget
+            # Trim the biggest sections first, each down to at most its minimum
+            for name in sorted((n for n in texts if n in self.sections), key=counts.get, reverse=True):
+                section = self.sections[name]
+                cut = min(overflow, counts[name] - section.min_tokens)
+                if cut <= 0:
+                    continue
+                texts[name] = self._fit(values[name], counts[name] - cut, section.keep)
+                new_count = self.tokenizer.count(texts[name])
+                overflow -= counts[name] - new_count
+                total -= counts[name] - new_count
+                counts[name] = new_count
+                if name not in truncated:
+                    truncated.append(name)
+                if overflow <= 0:
+                    break
+
+        text = ''.join(literal + (texts[field] if field is not None else '') for literal, field in self._parts)
+        return Prompt(text, total, truncated)
+
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer():
+    """Process-wide tokenizer (PROMPT_TOKENIZER names the tiktoken encoding)"""
+    global _tokenizer
+    with _tokenizer_lock:
+        if _tokenizer is None:
+            _tokenizer = Tokenizer(os.getenv('PROMPT_TOKENIZER', 'cl100k_base'))
+        return _tokenizer
+
+
+def context_budget(max_output_tokens):
+    """Prompt tokens available once the reply's max_tokens is reserved"""
+    context = int(os.getenv('PROMPT_CONTEXT_SIZE', DEFAULT_CONTEXT_SIZE))
+    margin = float(os.getenv('PROMPT_TOKEN_MARGIN', DEFAULT_MARGIN))
+    return int((context - max_output_tokens) * (1 - margin))
@@ -0,0 +1,191 @@
+"""
+Recommendation prompt layouts.
+The instructions and output format are the same for every developer. In the
+default "prefix" layout they form a byte-identical system message, followed by
+a user message carrying the shared trends context and then the per-user
+profile, so llama.cpp-style runners reuse the prompt KV cache for everything
+except the profile. The "inline" layout is the original single message with
+the profile ahead of the instructions.
+When retrieved candidate ideas are included, shorter "adapt" instructions
+replace the full ones: the model picks candidates by number and writes only
+what changes for the developer, with a smaller reply budget.
+"""
+
+import os
+
+from prompts import PromptTemplate, Section, context_budget, get_tokenizer
+
+LAYOUTS = ('prefix', 'inline')
+
+RECOMMENDATION_MAX_TOKENS = int(os.getenv('RECOMMENDATION_MAX_TOKENS', '1800'))
+ADAPT_MAX_TOKENS = int(os.getenv('RECOMMENDATION_ADAPT_MAX_TOKENS', '900'))
+
+INTRO = 'You are an expert hackathon mentor. Based on this GitHub profile analysis, recommend 3 specific hackathon projects that would be perfect for this developer.'
+
+INSTRUCTIONS = """## Instructions:
+Recommend 3 hackathon projects that:
+1. Match the developer's demonstrated skills and interests
+2. Can realistically be built in 24-48 hours
+3. Address real problems or leverage current tech trends
+4. Showcase the developer's strengths while being achievable
+5. Have clear potential for impact and innovation
+
+Format each recommendation exactly like this:
+
+**🚀 Project 1: [Creative, memorable project name]**
+
+**Category**: [e.g., AI Agents, Developer Tools, Web3, Climate Tech, Accessibility, etc.]
+
+**Description**: [2-3 compelling sentences describing what the project does, why it's valuable, and what problem it solves]
+
+**Tech Stack**: [Specific technologies, prioritizing languages/frameworks the developer knows]
+
+**Key Features**:
+• [Main feature 1]
+• [Main feature 2] 
+• [Main feature 3]
+• [Bonus feature if time permits]
+
+**Difficulty**: [Beginner/Intermediate/Advanced - based on their experience level]
+
+**Why Perfect for You**: [2-3 sentences explaining how this matches their GitHub activity, skills, and interests]
+
+**Potential Impact**: [Who would benefit and how this could make a difference]
+
+---
+
+**🚀 Project 2: [Different creative name]**
+[Same format...]
+
+---
+
+**🚀 Project 3: [Different creative name]**
+[Same format...]
+
+---
+
+**💡 Pro Tips for Success**:
+• Start with the core functionality first
+• Focus on user experience and clear value proposition
+• Prepare a compelling demo that shows real-world usage
+• Consider open-sourcing for community impact
+
+Keep recommendations innovative, practical, and directly relevant to their programming background. Each project should feel exciting and achievable while demonstrating technical skill."""
+
+# Candidates already carry a category, description and stack, so the reply
+# only names the candidate and personalizes it
+ADAPT_INSTRUCTIONS = """## Instructions:
+Pick the 3 candidate ideas that best fit this developer and adapt each to their skills. Only invent a new idea if none fit.
+
+Format each recommendation exactly like this:
+
+**🚀 Project 1: [Project name, renamed if adapted]**
+
+**Based On**: Candidate [number]
+
+**Description**: [1 sentence on what this version builds]
+
+**Tech Stack**: [Technologies, prioritizing ones the developer knows]
+
+**Key Features**:
+• [Feature 1]
+• [Feature 2]
+• [Feature 3]
+
+**Why Perfect for You**: [1 sentence tied to their GitHub activity]
+
+---
+
+Repeat for Projects 2 and 3. Write nothing after the last project."""
+
+PROFILE = """## Developer Profile Analysis:
+**Username**: @{login}
+**Public Repositories**: {public_repos}
+**Primary Languages**: {languages}
+**Repository Topics**: {topics}
+**Technologies Used**: {frameworks}
+**Profile Bio**: {bio}"""
+
+CONTEXT = """## Context:
+{trends}"""
+
+# Variable sections are capped so the prompt always fits the model context
+# next to the reply
+SECTIONS = {
+    "login": Section(20),
+    "languages": Section(40),
+    "topics": Section(60, 10),
+    "frameworks": Section(60, 10),
+    "bio": Section(100, 0),
+    "trends": Section(400, 50),
+    "candidates": Section(1000, 0)
+}
+
+# Static for every request: the cacheable prefix
+SYSTEM_PROMPT = f"{INTRO}\n\n{INSTRUCTIONS}"
+ADAPT_SYSTEM_PROMPT = f"{INTRO}\n\n{ADAPT_INSTRUCTIONS}"
+
+# Shared trends first (they change every refresh interval), the profile last
+PREFIX_TEMPLATE = PromptTemplate(f"{CONTEXT}\n\n{PROFILE}{{candidates}}", SECTIONS)
+
+INLINE_TEMPLATE = PromptTemplate(f"{INTRO}\n\n{PROFILE}\n\n{CONTEXT}{{candidates}}\n\n{INSTRUCTIONS}", SECTIONS)
+ADAPT_INLINE_TEMPLATE = PromptTemplate(
+    f"{INTRO}\n\n{PROFILE}\n\n{CONTEXT}{{candidates}}\n\n{ADAPT_INSTRUCTIONS}", SECTIONS
+)
+
+SYSTEM_TOKENS = {
+    prompt: get_tokenizer().count(prompt) for prompt in (SYSTEM_PROMPT, ADAPT_SYSTEM_PROMPT)
+}
+
+
+def candidates_section(candidates):
+    """Prompt section listing retrieved ideas for the model to adapt"""
+    if not candidates:
+        return ""
+    lines = [
+        f"{number}. **{idea['name']}** ({idea.get('category', 'General')}): {idea['description']} "
+        f"Tech: {', '.join(idea.get('tech', []))}"
+        for number, idea in enumerate(candidates, 1)
+    ]
+    # Heading first so budget trimming only drops the last candidates
+    return "\n\n## Candidate Ideas:\n" + "\n".join(lines)
+
+
+def reply_tokens(candidates=()):
+    """max_tokens for a recommendation reply: adapting candidates needs less"""
+    return ADAPT_MAX_TOKENS if candidates else RECOMMENDATION_MAX_TOKENS
+
+
+def prompt_layout():
+    """Layout selected by PROMPT_LAYOUT"""
+    layout = os.getenv('PROMPT_LAYOUT', 'prefix')
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unsupported PROMPT_LAYOUT: {layout}")
+    return layout
+
+
+def recommendation_messages(user_info, top_languages, top_topics, top_frameworks, trends_context,
+                            candidates=(), layout='prefix', max_tokens=None):
+    """Chat messages for a developer profile, plus the rendered Prompt for logging"""
+    values = dict(
+        login=user_info.get('login'),
+        public_repos=user_info.get('public_repos', 0),
+        languages=top_languages or 'Various',
+        topics=top_topics or 'General development',
+        frameworks=top_frameworks or 'Various frameworks',
+        bio=user_info.get('bio') or 'Not provided',
+        trends=trends_context,
+        candidates=candidates_section(candidates)
+    )
+    budget = context_budget(max_tokens or reply_tokens(candidates))
+    if layout == 'inline':
+        template = ADAPT_INLINE_TEMPLATE if candidates else INLINE_TEMPLATE
+        prompt = template.render(budget=budget, **values)
+        return [{"role": "user", "content": prompt.text}], prompt
+
+    system = ADAPT_SYSTEM_PROMPT if candidates else SYSTEM_PROMPT
+    prompt = PREFIX_TEMPLATE.render(budget=budget - SYSTEM_TOKENS[system], **values)
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt.text}
+    ], prompt
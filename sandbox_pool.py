@@ -0,0 +1,386 @@
+"""
+Warm pool of node-code-sandbox MCP servers for the coding agent.
+Each worker is a long-lived `docker run -i mcp/node-code-sandbox` process
+spoken to with JSON-RPC over stdio, so an execution costs a round trip
+instead of a container start. Workers are health-checked before reuse,
+recycled after a number of executions or when they crash or time out, and
+get an empty files directory for every execution.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+
+DEFAULT_IMAGE = 'mcp/node-code-sandbox'
+DEFAULT_TIMEOUT = 60
+PROTOCOL_VERSION = '2024-11-05'
+
+
+class SandboxError(Exception):
+    """Raised when a sandbox worker cannot be started or stops responding"""
+
+
+class SandboxTimeout(SandboxError):
+    """Raised when a sandbox worker does not answer in time"""
+
+
+def docker_command(image, files_dir):
+    """Command that serves the sandbox MCP server on stdio with files_dir as its files directory"""
+    return [
+        "docker", "run", "--rm", "-i",
+        "-v", "/var/run/docker.sock:/var/run/docker.sock",
+        "-v", f"{files_dir}:/root",
+        "-e", "FILES_DIR=/root",
+        image
+    ]
+
+
+class SandboxWorker:
+    """One sandbox MCP server process and the files directory it writes to"""
+
+    def __init__(self, command, files_dir, start_timeout=DEFAULT_TIMEOUT):
+        self.files_dir = files_dir
+        self.executions = 0
+        self.last_used = time.monotonic()
+        os.makedirs(files_dir, exist_ok=True)
+
+        self._ids = itertools.count(1)
+        self._lines = queue.Queue()
+        self._stderr = deque(maxlen=20)
+        self.process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, bufsize=1
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+        try:
+            self.request("initialize", {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "coding-agent", "version": "1.0"}
+            }, start_timeout)
+            self.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        except Exception:
+            self.close()
+            raise
+
+    def _read_stdout(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            self._stderr.append(line.rstrip())
+
+    def _exit_detail(self):
+        """Last line the worker logged, or its exit code"""
+        try:
+            code = self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            code = None
+        if self._stderr:
+            return self._stderr[-1]
+        return f"exit code {code}"
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def send(self, message):
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            raise SandboxError(f"Sandbox worker exited: {self._exit_detail()}")
+
+    def request(self, method, params, timeout):
+        """Send a JSON-RPC request and return the response message"""
+        request_id = next(self._ids)
+        self.send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise SandboxTimeout(f"No reply to {method} within {timeout:g}s")
+            if line is None:
+                raise SandboxError(f"Sandbox worker exited: {self._exit_detail()}")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                # Log output on stdout is not part of the protocol
+                continue
+            # Skip notifications and server-initiated requests
+            if isinstance(message, dict) and message.get("id") == request_id and "method" not in message:
+                return message
+
+    def ping(self, timeout):
+        """True if the server answers an MCP ping in time"""
+        try:
+            return "result" in self.request("ping", {}, timeout)
+        except SandboxError:
+            return False
+
+    def reset(self):
+        """Empty the files directory so an execution never sees another's files"""
+        for name in os.listdir(self.files_dir):
+            path = os.path.join(self.files_dir, name)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+
+    def collect(self, output_dir):
+        """Move files written by the last execution into output_dir"""
+        for name in os.listdir(self.files_dir):
+            target = os.path.join(output_dir, name)
+            if os.path.isdir(target) and not os.path.islink(target):
+                shutil.rmtree(target)
+            shutil.move(os.path.join(self.files_dir, name), target)
+
+    def close(self, force=False):
+        """Stop the server; force stops one that may be stuck mid-execution"""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        if force:
+            # SIGTERM lets docker run stop the container too
+            self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        shutil.rmtree(self.files_dir, ignore_errors=True)
+
+
+class SandboxPool:
+    """Fixed-size pool of warm sandbox workers, each running one execution at a time
+
+    command builds a worker's command line from its files directory. Files
+    written by executions are moved to output_dir afterwards.
+    """
+
+    def __init__(self, size=2, max_executions=50, image=DEFAULT_IMAGE, output_dir='sandbox-output',
+                 timeout=DEFAULT_TIMEOUT, start_timeout=DEFAULT_TIMEOUT, health_interval=30, command=None):
+        self.size = size
+        self.max_executions = max_executions
+        self.output_dir = os.path.abspath(output_dir)
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.health_interval = health_interval
+        self.command = command or (lambda files_dir: docker_command(image, files_dir))
+
+        self._idle = queue.Queue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._numbers = itertools.count(1)
+        self._workers = 0
+        self._closed = False
+
+        self.started = 0
+        self.recycled = 0
+        self.failed = 0
+        self.executions = 0
+
+    def _start_worker(self):
+        files_dir = os.path.join(self.output_dir, '.workers', f"{os.getpid()}-{next(self._numbers)}")
+        started = time.perf_counter()
+        try:
+            worker = SandboxWorker(self.command(files_dir), files_dir, self.start_timeout)
+        except SandboxError:
+            raise
+        except Exception as e:
+            raise SandboxError(f"Could not start sandbox worker: {e}")
+        with self._lock:
+            self.started += 1
+        print(f"🧰 Sandbox worker ready in {time.perf_counter() - started:.1f}s")
+        return worker
+
+    def _replace_in_background(self):
+        """Start a worker for a freed place in the pool so the next execution finds it warm"""
+        def run():
+            try:
+                worker = self._start_worker()
+            except SandboxError as e:
+                print(f"⚠️ Sandbox worker failed to start: {e}")
+                with self._lock:
+                    self._workers -= 1
+                # Wake a waiting execution so it can try a start of its own
+                self._idle.put(None)
+                return
+            if self._closed:
+                with self._lock:
+                    self._workers -= 1
+                worker.close()
+            else:
+                self._idle.put(worker)
+        threading.Thread(target=run, name='sandbox-start', daemon=True).start()
+
+    def warm(self):
+        """Start workers in the background until the pool is full"""
+        with self._lock:
+            missing = self.size - self._workers
+            self._workers += missing
+        for _ in range(missing):
+            self._replace_in_background()
+
+    def _discard(self, worker, replace, force=False):
+        with self._lock:
+            self.recycled += 1
+            replace = replace and not self._closed
+            # A replacement keeps the worker's place in the pool
+            if not replace:
+                self._workers -= 1
+        threading.Thread(target=worker.close, args=(force,), daemon=True).start()
+        if replace:
+            self._replace_in_background()
+
+    def _healthy(self, worker):
+        if not worker.alive():
+            return False
+        if time.monotonic() - worker.last_used < self.health_interval:
+            return True
+        return worker.ping(min(self.timeout, 10))
+
+    def acquire(self, timeout=None):
+        """Check out a healthy worker; release() must be called with it"""
+        if self._closed:
+            raise SandboxError("Sandbox pool is closed")
+        # Executions are bounded by their own timeout, so by default wait for one to finish
+        if not self._slots.acquire(timeout=timeout):
+            raise SandboxTimeout("No sandbox worker became free in time")
+        try:
+            while True:
+                try:
+                    worker = self._idle.get_nowait()
+                except queue.Empty:
+                    with self._lock:
+                        start = self._workers < self.size
+                        if start:
+                            self._workers += 1
+                    if start:
+                        try:
+                            return self._start_worker()
+                        except SandboxError:
+                            with self._lock:
+                                self._workers -= 1
+                            raise
+                    try:
+                        # A worker is starting or finishing for this slot
+                        worker = self._idle.get(timeout=self.start_timeout)
+                    except queue.Empty:
+                        raise SandboxTimeout("No sandbox worker became ready in time")
+                if worker is None:
+                    continue
+                if self._healthy(worker):
+                    return worker
+                print("⚠️ Sandbox worker failed its health check, replacing it")
+                self._discard(worker, replace=False, force=True)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, worker, healthy=True):
+        """Return a worker to the pool, recycling it if it is worn out or broken"""
+        worker.executions += 1
+        worker.last_used = time.monotonic()
+        if not healthy or not worker.alive():
+            with self._lock:
+                self.failed += 1
+            self._discard(worker, replace=True, force=True)
+        elif self._closed or (self.max_executions and worker.executions >= self.max_executions):
+            self._discard(worker, replace=True)
+        else:
+            self._idle.put(worker)
+        self._slots.release()
+
+    def call_tool(self, tool_name, arguments, timeout=None):
+        """Call a sandbox MCP tool and return {"success": ..., "data"/"error": ...}
+
+        A call that ran out of time also has "timed_out": True; other errors
+        come from the pool or the worker, not the tool.
+        """
+        timeout = timeout or self.timeout
+        try:
+            worker = self.acquire()
+        except SandboxError as e:
+            return {"success": False, "error": str(e)}
+        healthy = False
+        try:
+            worker.reset()
+            message = worker.request("tools/call", {"name": tool_name, "arguments": arguments}, timeout)
+            healthy = True
+        except SandboxTimeout:
+            return {"success": False, "error": f"Execution timed out ({timeout:g}s limit)", "timed_out": True}
+        except SandboxError as e:
+            return {"success": False, "error": str(e)}
+        finally:
+            if healthy:
+                try:
+                    worker.collect(self.output_dir)
+                except OSError as e:
+                    print(f"⚠️ Could not collect sandbox files: {e}")
+                    healthy = False
+            with self._lock:
+                self.executions += 1
+            self.release(worker, healthy)
+        if "result" in message:
+            return {"success": True, "data": message["result"]}
+        return {"success": False, "error": message.get("error", "Unknown error")}
+
+    def close(self):
+        """Stop idle workers; busy ones stop when they are released"""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                with self._lock:
+                    self._workers -= 1
+                worker.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "workers": self._workers,
+                "idle": self._idle.qsize(),
+                "started": self.started,
+                "recycled": self.recycled,
+                "failed": self.failed,
+                "executions": self.executions
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool():
+    """Return the process-wide sandbox pool, created from environment configuration"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxPool(
+                size=int(os.getenv('SANDBOX_POOL_SIZE', '2')),
+                max_executions=int(os.getenv('SANDBOX_MAX_EXECUTIONS', '50')),
+                image=os.getenv('SANDBOX_IMAGE', DEFAULT_IMAGE),
+                output_dir=os.getenv('SANDBOX_OUTPUT_DIR', os.path.join(os.getcwd(), 'sandbox-output')),
+                timeout=float(os.getenv('SANDBOX_TIMEOUT', str(DEFAULT_TIMEOUT))),
+                start_timeout=float(os.getenv('SANDBOX_START_TIMEOUT', str(DEFAULT_TIMEOUT))),
+                health_interval=float(os.getenv('SANDBOX_HEALTH_INTERVAL', '30'))
+            )
+            atexit.register(_pool.close)
+        return _pool
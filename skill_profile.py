@@ -0,0 +1,192 @@
+"""
+Compact aggregated developer profile.
+Languages, topics and technologies are kept as parallel name/weight arrays
+with a per-profile index, with each repository contributing a weight from its
+size, stars and recency. Profiles rank their top entries without sorting
+everything and serialize to a stable, versioned binary record.
+"""
+
+import heapq
+import math
+import os
+import struct
+import time
+from array import array
+from datetime import datetime
+
+# Recency weights are 2 ** ((t - reference) / half-life), where reference is
+# the time the profile was built, so every weight is at most 1 and cannot
+# overflow. A stored profile is rebased to a newer reference before
+# repositories are added to it; only weight ratios matter for ranking.
+DEFAULT_HALF_LIFE_DAYS = 365
+
+MAGIC = b'HPRF'
+VERSION = 2
+# magic, version, repos, reference time, half-life in days, then entry
+# counts for languages, topics, technologies
+HEADER = struct.Struct('<4sBIddHHH')
+# weight, UTF-8 name length (the name follows)
+ENTRY = struct.Struct('<dH')
+
+# Weights this close to zero, relative to the change, count as removed
+CANCEL_TOLERANCE = 1e-9
+
+
+class WeightedCounts:
+    """Weights per name, stored as parallel name and weight arrays"""
+
+    __slots__ = ('names', 'weights', 'index')
+
+    def __init__(self):
+        self.names = []
+        self.weights = array('d')
+        # Position of each name, so adds do not scan the arrays
+        self.index = {}
+
+    def add(self, name, weight):
+        i = self.index.get(name)
+        if i is None:
+            if weight > 0:
+                self.index[name] = len(self.names)
+                self.names.append(name)
+                self.weights.append(weight)
+            return
+        self.weights[i] += weight
+        # Removing a repository's contribution can cancel an entry out
+        if self.weights[i] <= abs(weight) * CANCEL_TOLERANCE:
+            del self.index[name]
+            del self.names[i]
+            del self.weights[i]
+            for j in range(i, len(self.names)):
+                self.index[self.names[j]] = j
+
+    def scale(self, factor):
+        for i in range(len(self.weights)):
+            self.weights[i] *= factor
+
+    def top(self, k):
+        """The k heaviest names, heaviest first (ties keep first-seen order)"""
+        best = heapq.nlargest(k, range(len(self.names)), key=self.weights.__getitem__)
+        return [self.names[i] for i in best]
+
+    def items(self):
+        return list(zip(self.names, self.weights))
+
+    def __len__(self):
+        return len(self.names)
+
+
+def repo_timestamp(repo):
+    """Last push (or update) time of a repository as a Unix timestamp"""
+    value = repo.get('pushed_at') or repo.get('updated_at')
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return time.time()
+
+
+def decay(elapsed, half_life_days):
+    """Factor a weight shrinks by over elapsed seconds"""
+    return 2 ** (-max(0.0, elapsed) / (half_life_days * 86400))
+
+
+def repo_weight(repo, reference, half_life_days=DEFAULT_HALF_LIFE_DAYS):
+    """How much a repository counts towards a profile built at reference"""
+    # Size (KB) and stars grow the weight logarithmically so one huge or
+    # popular repository cannot drown out the rest
+    size = 1 + math.log10(1 + (repo.get('size') or 0))
+    stars = 1 + math.log10(1 + (repo.get('stargazers_count') or 0))
+    # Pushes after the reference (clock skew) count as current
+    return size * stars * decay(reference - repo_timestamp(repo), half_life_days)
+
+
+class Profile:
+    """Weighted languages, topics and technologies of a developer
+
+    Weights are relative to the reference time the profile was built at.
+    """
+
+    __slots__ = ('repos', 'reference', 'half_life_days', 'languages', 'topics', 'frameworks')
+
+    def __init__(self, reference=None, half_life_days=DEFAULT_HALF_LIFE_DAYS):
+        if not half_life_days > 0:
+            raise ValueError(f"Recency half-life must be positive, got {half_life_days}")
+        self.repos = 0
+        self.reference = time.time() if reference is None else reference
+        self.half_life_days = half_life_days
+        self.languages = WeightedCounts()
+        self.topics = WeightedCounts()
+        self.frameworks = WeightedCounts()
+
+    def rebase(self, reference):
+        """Move the profile's weights forward to a later reference time"""
+        if reference > self.reference:
+            factor = decay(reference - self.reference, self.half_life_days)
+            for counts in self.sections():
+                counts.scale(factor)
+            self.reference = reference
+
+    def add_repo(self, repo, technologies):
+        """Fold one repository and its detected technologies into the profile"""
+        weight = repo_weight(repo, self.reference, self.half_life_days)
+        self.repos += 1
+        if repo.get('language'):
+            self.languages.add(repo['language'], weight)
+        for topic in repo.get('topics') or ():
+            self.topics.add(topic, weight)
+        for technology in technologies:
+            self.frameworks.add(technology, weight)
+
+    def merge(self, other, sign=1):
+        """Add (sign=1) or remove (sign=-1) another profile's repositories"""
+        self.rebase(other.reference)
+        factor = sign * decay(self.reference - other.reference, self.half_life_days)
+        self.repos += sign * other.repos
+        for mine, theirs in zip(self.sections(), other.sections()):
+            for name, weight in theirs.items():
+                mine.add(name, factor * weight)
+
+    def sections(self):
+        return self.languages, self.topics, self.frameworks
+
+    def top(self, languages=5, topics=10, frameworks=8):
+        """Heaviest languages, topics and technologies"""
+        return self.languages.top(languages), self.topics.top(topics), self.frameworks.top(frameworks)
+
+    def to_bytes(self):
+        """Serialize to a little-endian binary record"""
+        sections = self.sections()
+        parts = [HEADER.pack(MAGIC, VERSION, self.repos, self.reference, self.half_life_days,
+                             *map(len, sections))]
+        for counts in sections:
+            for name, weight in counts.items():
+                encoded = name.encode('utf-8')
+                parts.append(ENTRY.pack(weight, len(encoded)))
+                parts.append(encoded)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a profile serialized with to_bytes()"""
+        magic, version = data[:4], data[4] if len(data) > 4 else None
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported profile record (version {version})")
+        _, _, repos, reference, half_life_days, *sizes = HEADER.unpack_from(data)
+        profile = cls(reference, half_life_days)
+        profile.repos = repos
+        offset = HEADER.size
+        for counts, size in zip(profile.sections(), sizes):
+            for _ in range(size):
+                weight, length = ENTRY.unpack_from(data, offset)
+                offset += ENTRY.size
+                counts.add(data[offset:offset + length].decode('utf-8'), weight)
+                offset += length
+        return profile
+
+
+def half_life_setting():
+    """Recency half-life in days from environment configuration"""
+    days = float(os.getenv('PROFILE_HALF_LIFE_DAYS', DEFAULT_HALF_LIFE_DAYS))
+    if not days > 0:
+        raise ValueError(f"PROFILE_HALF_LIFE_DAYS must be positive, got {days:g}")
+    return days
@@ -0,0 +1,60 @@
+"""
+Technology detection for repository names and descriptions.
+The taxonomy (canonical technology -> synonyms) is compiled once into a single
+trie-shaped regular expression with word boundaries, so a scan is linear in
+the text and does not slow down as the taxonomy grows.
+"""
+
+import json
+import os
+import re
+
+DEFAULT_TAXONOMY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'taxonomy.json')
+
+SEPARATORS = re.compile(r'[\s_-]+')
+
+
+def normalize_text(text):
+    """Lower-case text and treat spaces, dashes and underscores alike"""
+    return SEPARATORS.sub(' ', text.lower())
+
+
+def _trie_pattern(node):
+    """Regex for every term below a trie node; longer terms are tried first"""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    return f'(?:{body})?' if '' in node else body
+
+
+class SkillMatcher:
+    """Word-boundary-aware multi-term matcher mapping synonyms to canonical names"""
+
+    def __init__(self, taxonomy):
+        self.canonical = {}
+        for name, synonyms in taxonomy.items():
+            for term in [name, *synonyms]:
+                term = normalize_text(term).strip()
+                if term:
+                    self.canonical.setdefault(term, name)
+
+        trie = {}
+        for term in self.canonical:
+            node = trie
+            for ch in term:
+                node = node.setdefault(ch, {})
+            node[''] = {}
+
+        self.pattern = re.compile(r'(?<![a-z0-9])' + _trie_pattern(trie) + r'(?![a-z0-9])')
+
+    def find(self, text):
+        """Return the canonical technologies mentioned in text"""
+        return {self.canonical[m.group(0)] for m in self.pattern.finditer(normalize_text(text))}
+
+
+def load_skill_matcher(path=None):
+    """Build a SkillMatcher from a JSON taxonomy file"""
+    path = path or os.getenv('SKILL_TAXONOMY', DEFAULT_TAXONOMY)
+    with open(path) as f:
+        return SkillMatcher(json.load(f))
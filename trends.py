@@ -0,0 +1,122 @@
+"""
+Background refresher for hackathon trend research.
+Runs the DuckDuckGo searches on a timer and publishes an immutable snapshot,
+so request handlers read the latest trends without any network calls.
+"""
+
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+TrendsSnapshot = namedtuple('TrendsSnapshot', ['results', 'summary', 'updated_at'])
+
+EMPTY_SNAPSHOT = TrendsSnapshot((), '', 0.0)
+
+# How soon to retry when no snapshot has been fetched yet
+RETRY_INTERVAL = 60
+
+NUMBERED_LINE = re.compile(r'^\s*\d+\.\s+(.+?)\s*$')
+
+
+def extract_results(data):
+    """Normalize the different search response formats into a list"""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in ('results', 'items', 'content'):
+            if isinstance(data.get(key), list):
+                return data[key]
+    return []
+
+
+def result_titles(result):
+    """Return the headline(s) of a single search result"""
+    if isinstance(result, dict):
+        if result.get('title'):
+            return [result['title'].strip()]
+        result = result.get('text', '')
+    if isinstance(result, str):
+        # Text content lists results as "1. Title" followed by URL/summary lines
+        return [m.group(1) for m in map(NUMBERED_LINE.match, result.splitlines()) if m]
+    return []
+
+
+def summarize_trends(results, limit=5, fallback=''):
+    """Condense search results into a one-line trends context"""
+    titles = []
+    for result in results:
+        for title in result_titles(result):
+            if title not in titles:
+                titles.append(title)
+    if titles:
+        return "Current hackathon trends: " + "; ".join(titles[:limit]) + "."
+    return fallback if results else ''
+
+
+class TrendsRefresher:
+    """Periodically runs trend searches in parallel and keeps the latest snapshot"""
+
+    def __init__(self, call_tool, queries, interval=900, max_results=3, fallback=''):
+        self.call_tool = call_tool
+        self.queries = list(queries)
+        self.interval = interval
+        self.max_results = max_results
+        self.fallback = fallback
+        self._snapshot = EMPTY_SNAPSHOT
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Return the latest published snapshot"""
+        return self._snapshot
+
+    def _search(self, query):
+        return self.call_tool("search", {
+            "query": query,
+            "max_results": self.max_results
+        })
+
+    def refresh(self):
+        """Run all trend searches now and publish a new snapshot if any succeeded"""
+        with ThreadPoolExecutor(max_workers=max(len(self.queries), 1)) as pool:
+            responses = list(pool.map(self._search, self.queries))
+
+        successful = [r for r in responses if r.get("success") and r.get("data")]
+        if not successful:
+            print("⚠️ Trend refresh failed, keeping previous snapshot")
+            return self._snapshot
+
+        results = []
+        for response in successful:
+            results.extend(extract_results(response["data"]))
+
+        self._snapshot = TrendsSnapshot(
+            tuple(results),
+            summarize_trends(results, fallback=self.fallback),
+            time.time()
+        )
+        print(f"✅ Refreshed hackathon trends ({len(results)} results)")
+        return self._snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            if time.time() - self._snapshot.updated_at >= self.interval:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"❌ Trend refresh error: {e}")
+            self._stop.wait(self.interval if self._snapshot.updated_at else RETRY_INTERVAL)
+
+    def start(self):
+        """Start the background refresh thread (idempotent)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='trends', daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()